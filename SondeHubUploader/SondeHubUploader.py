@@ -8,6 +8,10 @@
 # Modules
 import threading
 import queue
+import copy
+
+from SondeHubUploader.ringBuffer import RingBuffer
+from SondeHubUploader.dedupeIndex import DedupeIndex
 
 
 class SondeHubUploader:
@@ -23,63 +27,142 @@ class SondeHubUploader:
     import SondeHubUploader.telemetryChecks as telemetryChecks
     import SondeHubUploader.uploader as uploader
     import SondeHubUploader.utils as utils
+    import SondeHubUploader.asyncEngine as asyncEngine
+    import SondeHubUploader.jsonCodec as jsonCodec
+    import SondeHubUploader.caches as caches
+    import SondeHubUploader.clock as clock
+    import SondeHubUploader.admission as admission
+    import SondeHubUploader.workerProcesses as workerProcesses
+    import SondeHubUploader.pipeline as pipeline
+    import SondeHubUploader.aggregator as aggregator
 
     # Init function
     def __init__(self, args):
         # Save the provided configuration parameters
-        self.__dict__.update(args)
+        # They are copied (including lists like 'pos' and 'listen'), so changing them afterwards doesn't affect this instance
+        self.__dict__.update(copy.deepcopy(args))
+        # They are also passed on to the worker processes (if there are any)
+        self.worker_args = copy.deepcopy(args)
 
         # Create a logger
         self.logger.create_logger(self, self.loglevelp, self.loglevelw, self.writel)
 
-        # Create a crc calculator
-        self.crc.crc_create_calculator(self, 16, 0x1021, 0xFFFF, 0xFFFF, True, True)
+        self.loggerObj.debug('JSON backend: %s', self.jsonCodec.backend)
+
+        # Prepare everything that is needed for processing packages
+        self.utils.prepare_processing(self)
         
         # Used to break out of while-loops when the SondeHubUploader is terminated
         self.running = True
         
-        # Queue for storing the incoming packages before processing
-        self.input_queue = queue.Queue(self.qin)
         # Queue for storing telemetry packages before uploading
         self.upload_queue = queue.Queue(self.qupl)
+        # Index of the serials and framenumbers of the telemetry packages recently put in the upload queue (for suppressing duplicates)
+        self.dedupe_index = DedupeIndex(self.shuConfig.dedupe_index_size, self.shuConfig.dedupe_window)
+        # Number of telemetry packages put in the upload queue, suppressed as duplicates and dropped because the upload queue was full
+        self.upload_statistics = {'queued': 0, 'duplicates': 0, 'dropped': 0}
+        # Protects the dedupe index and the upload statistics while a batch is stored to the upload queue (See 'threads.put_upload_batch')
+        self.upload_lock = threading.Lock()
+        # The session for uploading to SondeHub (shared by all instances within a process)
+        self.session = self.uploader.create_session(self)
+        # The URLs for uploading to SondeHub
+        self.sondehub_telemetry_url = self.surl.rstrip('/') + self.shuConfig.sondehub_telemetry_path
+        self.sondehub_station_url = self.surl.rstrip('/') + self.shuConfig.sondehub_station_path
+        # Reformatted telemetry is pushed to the aggregator (if there is one and this instance isn't the aggregator itself)
+        if self.aggs is not None and self.aggm == 0:
+            self.aggregator.create_push_socket(self)
+
+        # The aggregator doesn't receive any packages itself, so there are neither listeners nor worker processes
+        # It always uses the threads engine
+        if self.aggm == 1:
+            self.engine = 0
+            self.procs = 0
+            self.listeners = []
+        # All addresses and ports that packages are received on
+        # Each listener has its own statistics, while all listeners share the same processing and upload
+        else:
+            self.listeners = [(self.addr, self.port)] + (self.listen if self.listen is not None else [])
+        self.listener_statistics = [{'received': 0, 'dropped': 0, 'overruns': 0} for listener in self.listeners]
+        # The statistics of the pipeline stages (only if the pipeline is used)
+        self.stage_statistics = {}
 
-        # Set the source address to not mandatory if a user callsign was provided
-        self.shuConfig.telemetry['source_address']['mandatory'] = False
-        
         # Stores the last time the station was uploaded
         self.last_station_upload = 0
         # Stores the last time telemetry was uploaded
         self.last_telemetry_upload = 0
-
-        # Disable upload for all radiosondes that were not enabled
-        self.utils.disable_radiosondes(self, self.sonde)
-        
-        # Create a thread for receiving packages
-        self.receive_thread = threading.Thread(target=self.threads.receive, args=(self,))
-        self.receive_thread.start()
-        self.loggerObj.debug('udp_receive thread started')
-        
-        # Create a thread for processing packages
-        self.process_input_queue_thread = threading.Thread(target=self.threads.process_input_queue, args=(self,))
-        self.process_input_queue_thread.start()
-        self.loggerObj.debug('process_input_queue thread started')
-
-        # Create a thread for uploading the station
-        self.upload_station_thread = threading.Thread(target=self.threads.upload_station, args=(self,))
-        self.upload_station_thread.start()
-        self.loggerObj.debug('upload_station thread started')
         
+        # The asyncio engine runs receiving, processing and uploading within a single event loop
+        if self.engine == 1:
+            self.asyncEngine.start(self)
+            return
+
+        # All worker threads by their name
+        self.workers = {}
+
+        # The aggregator only receives reformatted telemetry pushed by other instances and uploads it
+        # So it neither processes packages, nor does it upload the station
+        if self.aggm == 1:
+            self.aggregator.start_aggregator(self)
+        else:
+            # Ring buffers for storing the incoming packages before processing (one for each listener)
+            self.input_rings = [RingBuffer(self.rslots, self.rsize) for listener in self.listeners]
+            # Used by the receive threads to notify the processing thread about new packages
+            self.input_event = threading.Event()
+
+            # Create a thread for receiving packages for each listener
+            for listener in range(len(self.listeners)):
+                self.threads.start_worker(self, 'udp_receive (%s:%d)' % self.listeners[listener], self.threads.receive, (self, listener))
+
+            # If worker processes are used, packages are only handed over to them
+            # Their results are collected by another thread and put in the upload queue
+            if self.procs > 0:
+                self.workerProcesses.start_worker_processes(self)
+                self.threads.start_worker(self, 'dispatch_input_queue', self.threads.dispatch_input_queue, (self,))
+                self.threads.start_worker(self, 'collect_worker_results', self.threads.collect_worker_results, (self,))
+            # If the pipeline is used, each processing stage has its own thread
+            elif self.pipe == 1:
+                self.pipeline.start_pipeline(self)
+            # Otherwise a single thread processes the packages
+            else:
+                self.threads.start_worker(self, 'process_input_queue', self.threads.process_input_queue, (self,))
+
+            # Create a thread for uploading the station
+            self.threads.start_worker(self, 'upload_station', self.threads.upload_station, (self,))
+
         # Create a thread for uploading telemetry
-        self.process_upload_queue_thread = threading.Thread(target=self.threads.process_upload_queue, args=(self,))
-        self.process_upload_queue_thread.start()
-        self.loggerObj.debug('process_upload_queue thread started')
+        self.threads.start_worker(self, 'process_upload_queue', self.threads.process_upload_queue, (self,))
+
+        # Create a thread for supervising all worker threads
+        # Worker threads that died are restarted, so a single error can't stop receiving, processing or uploading
+        self.supervisor_thread = threading.Thread(target=self.threads.supervise, args=(self,))
+        self.supervisor_thread.start()
+        self.loggerObj.debug('supervisor thread started')
 
     # Close function
     def close(self):
         # Setting running to 'False' will cause breaking out of the while-loops in the threads
         self.running = False
-        # Join the threads
-        self.receive_thread.join()
-        self.process_input_queue_thread.join()
-        self.upload_station_thread.join()
-        self.process_upload_queue_thread.join()
+        # The asyncio engine stops all of its tasks and waits for them to finish
+        if self.engine == 1:
+            self.asyncEngine.stop(self)
+        else:
+            # Join the threads
+            # The supervisor is joined first, so it can't restart any worker thread while they are joined
+            self.supervisor_thread.join()
+            for thread, target, args in self.workers.values():
+                thread.join()
+            # Worker processes are stopped after all threads
+            if self.procs > 0:
+                self.workerProcesses.stop_worker_processes(self)
+        # The socket for pushing to the aggregator is not used anymore
+        if self.aggs is not None and self.aggm == 0:
+            self.push_socket.close()
+        # Log the statistics of all listeners, the admission filter and the caches one last time
+        self.utils.log_listener_statistics(self, self.loggerObj.info)
+        self.admission.log_admission_statistics(self, self.loggerObj.info)
+        self.utils.log_failure_statistics(self, self.loggerObj.info)
+        self.pipeline.log_stage_statistics(self, self.loggerObj.info)
+        self.workerProcesses.log_worker_statistics(self, self.loggerObj.info)
+        self.aggregator.log_aggregator_statistics(self, self.loggerObj.info)
+        self.utils.log_upload_statistics(self, self.loggerObj.info)
+        self.caches.log_cache_statistics(self.loggerObj.info)
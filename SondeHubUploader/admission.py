@@ -0,0 +1,68 @@
+# admission.py - Functions for admitting telemetry to the expensive processing steps
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import math
+import re
+
+
+# All reasons for rejecting telemetry
+# Rejections are counted separately for each reason
+rejection_reasons = ['disabled', 'serial', 'geofence', 'altitude']
+
+# Mean radius of the earth in km (used for the geofence)
+earth_radius = 6371.0
+
+
+# Create the admission filter from the configuration parameters
+def create_admission_filter(self):
+    # Number of rejected packages for each reason
+    self.admission_statistics = dict.fromkeys(rejection_reasons, 0)
+    # All patterns for rejected serials are combined into a single regular expression
+    self.admission_serial_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in self.rejser.split(','))) if self.rejser is not None else None
+    # The geofence is a circle around the user position
+    # Latitude and longitude of the user position are only converted to radians once
+    self.admission_geofence = (math.radians(self.pos[0]), math.radians(self.pos[1]), self.fence) if self.fence > 0 else None
+    # Each altitude band consists of a minimum and a maximum altitude
+    self.admission_altitude_bands = self.altb
+
+
+# Check whether telemetry is admitted to the further processing
+# Only the parameters needed are checked, so this is done right after the package was decoded
+# Parameters that are not available don't cause a rejection (they are handled by the mandatory data check)
+# Returns None if the telemetry is admitted, or the reason for rejecting it
+def check_admission(self, unified_telemetry, radiosonde):
+    # Telemetry of radiosonde types that are not enabled for upload is rejected
+    if radiosonde is not None and radiosonde not in self.enabled_radiosondes:
+        return 'disabled'
+    # Telemetry of radiosondes whose serial matches one of the patterns is rejected
+    if self.admission_serial_pattern is not None and 'serial' in unified_telemetry:
+        if self.admission_serial_pattern.match(unified_telemetry['serial']):
+            return 'serial'
+    # Telemetry of radiosondes outside the geofence is rejected
+    if self.admission_geofence is not None and 'latitude' in unified_telemetry and 'longitude' in unified_telemetry:
+        if calculate_distance(self.admission_geofence[0], self.admission_geofence[1], unified_telemetry['latitude'], unified_telemetry['longitude']) > self.admission_geofence[2]:
+            return 'geofence'
+    # Telemetry of radiosondes outside all altitude bands is rejected
+    if self.admission_altitude_bands is not None and 'altitude' in unified_telemetry:
+        if not any(minimum <= unified_telemetry['altitude'] <= maximum for minimum, maximum in self.admission_altitude_bands):
+            return 'altitude'
+    return None
+
+
+# Calculate the great-circle distance in km between a position (in radians) and a radiosonde (in degrees)
+def calculate_distance(latitude_radians, longitude_radians, latitude, longitude):
+    # The haversine formula is used
+    delta_latitude = math.radians(latitude) - latitude_radians
+    delta_longitude = math.radians(longitude) - longitude_radians
+    a = math.sin(delta_latitude / 2) ** 2 + math.cos(latitude_radians) * math.cos(math.radians(latitude)) * math.sin(delta_longitude / 2) ** 2
+    return 2 * earth_radius * math.asin(min(1.0, math.sqrt(a)))
+
+
+# Log the number of rejected packages for each reason
+def log_admission_statistics(self, log_function):
+    log_function('Admission filter (Rejected: %s)', ' / '.join(f'{reason.capitalize()}: {count}' for reason, count in self.admission_statistics.items()))
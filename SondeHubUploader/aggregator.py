@@ -0,0 +1,93 @@
+# aggregator.py - Aggregating the uploads of multiple instances
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import socket
+
+
+# Start the aggregator
+# The aggregator receives reformatted telemetry pushed by other instances on a Unix socket
+# Duplicates are suppressed across all instances when putting the telemetry in the upload queue (See 'threads.put_upload_batch')
+# The remaining telemetry is uploaded together
+def start_aggregator(self):
+    # Number of pushes, reformatted telemetry packages received and invalid packages that were dropped
+    self.aggregator_statistics = {'pushes': 0, 'received': 0, 'invalid': 0}
+    self.threads.start_worker(self, 'aggregator_receive', receive, (self,))
+
+
+# Receive reformatted telemetry pushed by other instances
+def receive(self):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as aggregator_socket:
+        # A socket file that was left over (e.g. by an aggregator that was killed) is removed first
+        if os.path.exists(self.aggs):
+            os.unlink(self.aggs)
+        aggregator_socket.bind(self.aggs)
+        # The timeout makes sure that the thread is able to check whether the SondeHubUploader is terminated
+        aggregator_socket.settimeout(self.shuConfig.thread_sleep)
+        self.loggerObj.debug('Aggregator socket bound (%s)', self.aggs)
+        try:
+            while self.running:
+                try:
+                    data = aggregator_socket.recv(self.shuConfig.aggregator_buffersize)
+                except socket.timeout:
+                    continue
+                self.aggregator_statistics['pushes'] += 1
+                # Every push is a JSON list of reformatted telemetry packages
+                try:
+                    telemetry = self.jsonCodec.loads(data)
+                except ValueError:
+                    self.loggerObj.error('Push is not valid JSON')
+                    continue
+                if type(telemetry) != list:
+                    self.loggerObj.error('Push is not a list of telemetry')
+                    continue
+                # Invalid packages are dropped, as they would break the upload queue (e.g. the dedupe index)
+                valid_telemetry = [package for package in telemetry if valid_package(package)]
+                if len(valid_telemetry) < len(telemetry):
+                    self.aggregator_statistics['invalid'] += len(telemetry) - len(valid_telemetry)
+                    self.loggerObj.error('Push contains invalid telemetry (%d packages dropped)', len(telemetry) - len(valid_telemetry))
+                self.aggregator_statistics['received'] += len(valid_telemetry)
+                self.threads.put_upload_batch(self, valid_telemetry)
+        finally:
+            os.unlink(self.aggs)
+
+
+# Check whether a pushed package is reformatted telemetry
+# At least the serial must be there and the framenumber (if there is one) must be a number, as both are used for deduplication
+def valid_package(package):
+    if type(package) != dict or type(package.get('serial')) != str:
+        return False
+    return 'frame' not in package or type(package['frame']) in (int, float)
+
+
+# Create the socket for pushing reformatted telemetry to the aggregator
+def create_push_socket(self):
+    self.push_socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    # Pushing must never hang if the aggregator doesn't keep up
+    self.push_socket.settimeout(self.timeout)
+
+
+# Push reformatted telemetry packages to the aggregator
+# The packages are split into multiple pushes, so every single push stays within the buffer size of the aggregator
+# Returns the packages that could not be pushed (e.g. if the aggregator is not running)
+def push_telemetry(self, telemetry):
+    for start in range(0, len(telemetry), self.shuConfig.aggregator_push_size):
+        try:
+            self.push_socket.sendto(self.jsonCodec.dumps(telemetry[start:start + self.shuConfig.aggregator_push_size]), self.aggs)
+        except OSError:
+            self.loggerObj.warning('Push to aggregator failed (%d packages are uploaded directly)', len(telemetry) - start)
+            return telemetry[start:]
+    self.loggerObj.info('%d telemetry packages pushed to aggregator', len(telemetry))
+    return []
+
+
+# Log the statistics of the aggregator (if running as aggregator)
+def log_aggregator_statistics(self, log_function):
+    if self.aggm == 0:
+        return
+    log_function('Aggregator (Pushes: %d / Received: %d / Invalid: %d)', self.aggregator_statistics['pushes'], self.aggregator_statistics['received'], self.aggregator_statistics['invalid'])
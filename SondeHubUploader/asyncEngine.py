@@ -0,0 +1,206 @@
+# asyncEngine.py - asyncio-based engine of the SondeHubUploader
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import asyncio
+import threading
+import time
+
+
+# Protocol for receiving packages
+class ReceiveProtocol(asyncio.DatagramProtocol):
+
+    # Init function
+    def __init__(self, shu, listener):
+        self.shu = shu
+        # The statistics of the listener this protocol belongs to
+        self.statistics = shu.listener_statistics[listener]
+
+    # Called by the event loop for every received package
+    def datagram_received(self, data, addr):
+        self.statistics['received'] += 1
+        self.shu.loggerObj.debug('Package received')
+        # Store the package to the input queue
+        # The input queue always holds lists of packages (along with the address of their sender)
+        # So a single package is stored as a list with one element
+        try:
+            self.shu.input_queue.put_nowait([(data, addr)])
+            self.shu.loggerObj.debug('Package put in input queue')
+        except asyncio.QueueFull:
+            self.statistics['dropped'] += 1
+            self.shu.loggerObj.warning('Input queue full')
+
+    # Called by the event loop if a previous send or receive operation raised an error
+    def error_received(self, exc):
+        self.shu.loggerObj.error('Error receiving package (%s)', exc)
+
+
+# Start the asyncio engine
+def start(self):
+    # All tasks of the asyncio engine share a single event loop
+    # The event loop runs in its own thread, so the main thread stays free
+    self.event_loop = asyncio.new_event_loop()
+    # Completing this future stops the asyncio engine
+    self.stop_future = self.event_loop.create_future()
+    # Set as soon as the asyncio engine is running (or failed to start)
+    self.engine_started = threading.Event()
+    # Stores the error that stopped the asyncio engine (if any)
+    self.engine_error = None
+    self.engine_thread = threading.Thread(target=run, args=(self,))
+    self.engine_thread.start()
+    # Wait until all datagram endpoints are created
+    # This way, an error creating them (e.g. a port that is already in use) makes the startup fail, instead of being noticed by nobody
+    self.engine_started.wait()
+    if self.engine_error is not None:
+        self.engine_thread.join()
+        raise self.engine_error
+    self.loggerObj.debug('asyncio engine thread started')
+
+
+# Stop the asyncio engine
+def stop(self):
+    # The future must be completed from within the event loop
+    # If the asyncio engine already stopped (e.g. because of an error), its event loop is closed and there is nothing to stop
+    if self.engine_thread.is_alive() and not self.event_loop.is_closed():
+        try:
+            self.event_loop.call_soon_threadsafe(set_stop_future, self)
+        # The event loop might have been closed in the meantime
+        except RuntimeError:
+            pass
+    self.engine_thread.join()
+
+
+# Complete the future that stops the asyncio engine (if not already done)
+def set_stop_future(self):
+    if not self.stop_future.done():
+        self.stop_future.set_result(None)
+
+
+# Run the event loop until the asyncio engine is stopped
+def run(self):
+    asyncio.set_event_loop(self.event_loop)
+    try:
+        self.event_loop.run_until_complete(main(self))
+        # Wait for uploads that are still running in the default executor
+        self.event_loop.run_until_complete(self.event_loop.shutdown_default_executor())
+    # Errors must not end the thread unnoticed
+    except Exception as error:
+        self.engine_error = error
+        if not self.engine_started.is_set():
+            self.loggerObj.error('asyncio engine failed to start (%s)', error)
+        else:
+            self.loggerObj.exception('asyncio engine failed')
+    finally:
+        self.event_loop.close()
+        # Startup waits for this event, so it must be set even if the asyncio engine failed to start
+        self.engine_started.set()
+
+
+# Main coroutine of the asyncio engine
+async def main(self):
+    # Queue for storing the incoming packages before processing
+    # The asyncio engine receives packages as bytes objects, so a queue is used instead of ring buffers
+    # The queue must be created within the event loop
+    self.input_queue = asyncio.Queue(self.qin)
+
+    # Create a datagram endpoint for receiving packages for each listener
+    transports = []
+    try:
+        for listener in range(len(self.listeners)):
+            transport, protocol = await self.event_loop.create_datagram_endpoint(lambda: ReceiveProtocol(self, listener), local_addr=self.listeners[listener])
+            transports.append(transport)
+            self.loggerObj.debug('Datagram endpoint created (%s:%d)', *self.listeners[listener])
+    # The datagram endpoints that were already created are closed, if creating any of them failed
+    except Exception:
+        for transport in transports:
+            transport.close()
+        raise
+
+    # Create the tasks for processing packages and uploading the station and the telemetry
+    tasks = [
+        asyncio.ensure_future(process_input_queue(self)),
+        asyncio.ensure_future(upload_station(self)),
+        asyncio.ensure_future(process_upload_queue(self))
+    ]
+    self.loggerObj.debug('asyncio engine tasks started')
+    self.engine_started.set()
+
+    # Wait until the asyncio engine is stopped
+    # Receiving and all tasks are stopped in any case, even if the asyncio engine is stopped because of an error
+    try:
+        await self.stop_future
+    finally:
+        # Stop receiving packages first, then cancel all tasks and wait for them to finish
+        for transport in transports:
+            transport.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loggerObj.debug('asyncio engine tasks stopped')
+
+
+# Process packages
+async def process_input_queue(self):
+    while True:
+        # Wait for a list of packages
+        packages = await self.input_queue.get()
+        # Further lists of packages are added to the batch until it is full or the deadline expired
+        deadline = self.event_loop.time() + self.pdead / 1000
+        while len(packages) < self.pbatch:
+            try:
+                packages += self.input_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - self.event_loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    packages += await asyncio.wait_for(self.input_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        self.loggerObj.debug('%d packages taken from input queue', len(packages))
+        # All packages of a batch are processed with the same current time
+        self.clock.tick()
+        # Errors are already contained for every single package
+        # Any other error must not end the task, as no further packages would be processed then
+        try:
+            self.threads.put_upload_batch(self, self.threads.process_batch(self, packages))
+        except Exception:
+            self.failure_statistics['batch'] += 1
+            self.loggerObj.exception('Error processing batch')
+
+
+# Upload the reformatted telemetry packages
+async def process_upload_queue(self):
+    while True:
+        # The upload is blocking, so it is performed in a separate thread in order not to block the event loop
+        # An error must not end the task, as no further telemetry would be uploaded then
+        try:
+            await asyncio.to_thread(self.threads.upload_queued_telemetry, self)
+        except Exception:
+            self.failure_statistics['worker'] += 1
+            self.loggerObj.exception('Error uploading telemetry')
+        # Save the upload time
+        self.last_telemetry_upload = time.time()
+        # Wait until it is time for the next upload, based on the configured update rate
+        await asyncio.sleep(self.telemu)
+
+
+# Upload the station
+async def upload_station(self):
+    while True:
+        self.loggerObj.debug('Station upload')
+        # The upload is blocking, so it is performed in a separate thread in order not to block the event loop
+        # An error must not end the task, as the station would not be uploaded anymore then
+        try:
+            await asyncio.to_thread(self.uploader.upload_station, self)
+        except Exception:
+            self.failure_statistics['worker'] += 1
+            self.loggerObj.exception('Error uploading station')
+        # Save the upload time
+        self.last_station_upload = time.time()
+        # Wait until it is time for the next upload, based on the configured update rate
+        await asyncio.sleep(self.posu * 3600)
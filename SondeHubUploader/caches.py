@@ -0,0 +1,50 @@
+# caches.py - Bounded caches for pure functions
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import functools
+
+
+# Maximum number of entries of every cache
+# Most cached values only depend on the radiosonde (or the receiver), so this only has to cover the radiosondes received at the same time
+cache_size = 256
+
+# All cached functions, stored by their name
+cached_functions = {}
+
+# Statistics of the caches of other processes (e.g. worker processes), stored by the name of the cached function
+# They are added to the statistics of the caches of this process, when the statistics are logged
+additional_statistics = {}
+
+
+# Decorator for caching the results of a pure function
+# The least recently used results are discarded once the cache is full
+# Hits and misses are counted, so the statistics can be logged
+def cached(function):
+    cached_function = functools.lru_cache(maxsize=cache_size)(function)
+    cached_functions[function.__name__] = cached_function
+    return cached_function
+
+
+# Get the statistics of all caches of this process
+# Hits, misses, max. size and size are stored by the name of the cached function
+def get_cache_statistics():
+    return {name: tuple(cached_function.cache_info()) for name, cached_function in cached_functions.items()}
+
+
+# Add the statistics of the caches of another process
+def add_cache_statistics(statistics):
+    for name, values in statistics.items():
+        additional_statistics[name] = tuple(map(sum, zip(additional_statistics.get(name, (0, 0, 0, 0)), values)))
+
+
+# Log the statistics of all caches using the provided logging function
+# The statistics of the caches of other processes are included, so the size is the total size of the caches of all processes
+def log_cache_statistics(log_function):
+    for name, values in get_cache_statistics().items():
+        hits, misses, maxsize, currsize = map(sum, zip(values, additional_statistics.get(name, (0, 0, 0, 0))))
+        log_function('Cache %s (Hits: %d / Misses: %d / Size: %d/%d)', name, hits, misses, currsize, maxsize)
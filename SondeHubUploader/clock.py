@@ -0,0 +1,65 @@
+# clock.py - Cached UTC clock
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import datetime
+import threading
+
+
+# The state of the clock
+# 'now' is the current UTC datetime
+# 'windows' holds the plausibility windows that were already calculated for the current UTC datetime
+# Every thread has its own state, so threads processing different batches at the same time (e.g. the stages of the pipeline) don't interfere
+# The state is replaced as a whole on every tick, so it is always consistent
+local = threading.local()
+# Threads that never ticked the clock use the state of the initial tick
+initial_state = None
+
+
+# Refresh the current UTC datetime of the calling thread
+# This is done once for every batch of packages, so all packages of a batch share the same current UTC datetime
+# A datetime might be provided instead of the current UTC datetime (e.g. the one a batch was decoded with or for testing)
+def tick(now=None):
+    local.state = {'now': now if now is not None else datetime.datetime.utcnow(), 'windows': {}}
+
+
+# Get the state of the clock of the calling thread
+def get_state():
+    return getattr(local, 'state', initial_state)
+
+
+# Get the current UTC datetime (as of the last tick)
+def now():
+    return get_state()['now']
+
+
+# Get the window of plausible dates (lower and upper threshold) around the current UTC date
+def date_window(difference_days):
+    # The windows are only calculated once per tick
+    state = get_state()
+    windows = state['windows']
+    key = ('date', difference_days)
+    if key not in windows:
+        date = state['now'].date()
+        windows[key] = (date - datetime.timedelta(days=difference_days), date + datetime.timedelta(days=difference_days))
+    return windows[key]
+
+
+# Get the window of plausible times (lower and upper threshold) around the current UTC time
+def time_window(difference_seconds):
+    # The windows are only calculated once per tick
+    state = get_state()
+    windows = state['windows']
+    key = ('time', difference_seconds)
+    if key not in windows:
+        windows[key] = ((state['now'] - datetime.timedelta(seconds=difference_seconds)).time(), (state['now'] + datetime.timedelta(seconds=difference_seconds)).time())
+    return windows[key]
+
+
+# The clock is ticked once initially, so it always holds a valid datetime
+tick()
+initial_state = local.state
@@ -5,17 +5,66 @@
 # Released under GNU GPL v3 or later
 
 
-import crc
+# Table-driven CRC-16 with reflected input and output (e.g. CRC-16/X.25, which is used by APRS)
+# The CRC is calculated bytewise using a precomputed table, instead of bitwise
+# All functions work on any bytes-like object (bytes, bytearray, memoryview), so packages don't have to be copied
+class Crc16:
+
+    # Init function
+    def __init__(self, polynomial, init_value, final_xor_value):
+        self.init_value = init_value
+        self.final_xor_value = final_xor_value
+        # Reflected input and output means that the bits are processed LSB first
+        # For that, the polynomial is reflected as well
+        reflected_polynomial = int('{:016b}'.format(polynomial)[::-1], 2)
+        # Precompute the CRC for every possible byte value
+        self.table = []
+        for i in range(256):
+            crc = i
+            for j in range(8):
+                crc = (crc >> 1) ^ reflected_polynomial if crc & 1 else crc >> 1
+            self.table.append(crc)
+
+    # Calculate the checksum of data
+    def checksum(self, data):
+        # Local variables are faster to access within the loop
+        table = self.table
+        crc = self.init_value
+        for byte in data:
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        return crc ^ self.final_xor_value
+
+    # Verify data against an expected checksum
+    def verify(self, data, expected):
+        return self.checksum(data) == expected
+
+    # Verify a frame that ends with its checksum (low byte first)
+    def verify_frame(self, frame):
+        # A frame must at least contain the checksum
+        if len(frame) < 2:
+            return False
+        return self.checksum(frame[:-2]) == frame[-1] << 8 | frame[-2]
+
+    # Verify a batch of frames at once (See 'verify_frame')
+    # The table and the values are looked up only once for the entire batch, instead of once per frame
+    # Returns a list that holds the result for every frame
+    def verify_batch(self, frames):
+        table = self.table
+        init_value = self.init_value
+        final_xor_value = self.final_xor_value
+        results = []
+        for frame in frames:
+            length = len(frame)
+            if length < 2:
+                results.append(False)
+                continue
+            crc = init_value
+            for byte in frame[:length - 2]:
+                crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+            results.append(crc ^ final_xor_value == frame[length - 1] << 8 | frame[length - 2])
+        return results
 
 
 # Create a crc calculator
-def crc_create_calculator(self, width, polynomial, init_value, final_xor_value, reverse_input, reverse_output):
-    configuration = crc.Configuration(
-        width=width,
-        polynomial=polynomial,
-        init_value=init_value,
-        final_xor_value=final_xor_value,
-        reverse_input=reverse_input,
-        reverse_output=reverse_output,
-    )
-    self.crc_calculator = crc.Calculator(configuration)
+def crc_create_calculator(self, polynomial, init_value, final_xor_value):
+    self.crc_calculator = Crc16(polynomial, init_value, final_xor_value)
@@ -0,0 +1,54 @@
+# dedupeIndex.py - Index for suppressing duplicate telemetry
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import collections
+
+
+# Index of recently seen keys (e.g. serial and framenumber of telemetry packages)
+# A key is considered a duplicate if it was seen within the time window before
+# The index holds a limited number of keys, the least recently seen key is removed first
+# The index is not thread-safe, so it must only be used by a single thread
+class DedupeIndex:
+
+    # Init function
+    def __init__(self, size, window):
+        self.size = size
+        self.window = window
+        # The keys along with the time they were seen the last time
+        # The keys are ordered by that time, so the least recently seen key is always the first one
+        self.entries = collections.OrderedDict()
+
+    # Check whether a key was seen within the time window
+    # The key is not marked as seen, this must be done separately (See 'add')
+    # Returns True if the key is a duplicate
+    def contains(self, key, now):
+        self.expire(now)
+        return key in self.entries
+
+    # Mark a key as seen
+    def add(self, key, now):
+        self.expire(now)
+        # The key is moved to the end, as it is the most recently seen one now
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        self.entries[key] = now
+        # The least recently seen key is removed if the index is full
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    # Remove the keys that were not seen within the time window
+    def expire(self, now):
+        while len(self.entries) > 0:
+            oldest_key, oldest_time = next(iter(self.entries.items()))
+            if now - oldest_time <= self.window:
+                break
+            self.entries.popitem(last=False)
+
+    # Get the number of keys that are stored in the index
+    def __len__(self):
+        return len(self.entries)
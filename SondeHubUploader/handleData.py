@@ -7,105 +7,208 @@
 
 # Modules
 import datetime
+import sys
+import threading
+# Own modules
+import SondeHubUploader.caches as caches
+import SondeHubUploader.clock as clock
+import SondeHubUploader.timestamp as timestamp
+
+
+# Marks a missing JSON telemetry parameter (None is a valid value in JSON telemetry)
+missing = object()
+
+# The compiled parse profiles and unification plans only depend on 'shuConfig'
+# So they are compiled only once and shared by all instances within a process
+compiled_parsers = {}
+compiled_parsers_lock = threading.Lock()
+
+# Translation table for the characters of the destination/source address of an APRS package
+# Only MSB to LSB+1 of each byte contains the ASCII character, so every byte is shifted to the right by one bit
+aprs_address_table = bytes(i >> 1 for i in range(256))
 
 
 # Parse an APRS package
 def parse_aprs(self, aprs_package):
-    aprs_telemetry = {}
-
     # At first the APRS telemetry parameters with fixed positions inside the APRS package are parsed
-    # Go through all possible APRS telemetry parameters with fixed positions
-    for parameter in self.shuConfig.parse_aprs_fixed_position:
+    # Usually all of them can be decoded at once
+    aprs_telemetry = parse_aprs_fixed_position(self, aprs_package)
+    # If that's not possible (package too short or invalid parameters), they are parsed one by one
+    if aprs_telemetry is None:
+        aprs_telemetry = {}
+        parse_aprs_fixed_position_single(self, aprs_package, aprs_telemetry)
+    else:
+        self.loggerObj.debug_detail('Fixed position parameters parsed (%s)', aprs_telemetry)
+
+    # Second, the optional APRS telemetry parameters are parsed from the comment
+    # The comment is decoded only once
+    # 'latin-1' maps every byte to exactly one character, so decoding never fails and the indices don't shift
+    comment = aprs_package[self.shuConfig.parse_aprs_comment_start:].decode('latin-1')
+    # The comment is split into tokens, which are preceded by a space or an exclamation mark
+    # Every token that starts with the prefix of an optional (multivalue) APRS telemetry parameter holds its value
+    # Only the first occurrence of every APRS telemetry parameter is parsed
+    parsed = set()
+    # As long as the radiosonde type is unknown, all optional APRS telemetry parameters are considered
+    prefixes = self.parse_profile_default['prefixes']
+    for token in self.shuConfig.parse_aprs_comment_token.finditer(comment):
+        # The prefix ends with the equal sign (if there is one)
+        prefix = token.group(1)[:token.group(1).find('=') + 1] or token.group(1)
+        parameter = prefixes.get(prefix)
+        if parameter is None or parameter in parsed:
+            continue
+        parsed.add(parameter)
+        # The value starts right after the prefix and ends with the unit
+        # The unit is searched for in the comment, not just in the token, as some values contain spaces (e.g. Pump=99mA 15.0V)
+        start_index = token.start(1) + len(prefix)
+        if parameter in self.shuConfig.parse_aprs_optional:
+            definition = self.shuConfig.parse_aprs_optional[parameter]
+        else:
+            definition = self.shuConfig.parse_aprs_optional_multivalue[parameter]
+        end_index = comment.find(definition['unit_end'], start_index)
+        # If the unit was not found, the APRS telemetry parameter is the last one in the comment
+        if end_index == -1:
+            end_index = len(comment)
         # The actual parsing is done using the parse function
         try:
-            # Check whether the APRS package actually contains the indices for the APRS telemetry parameters
-            if ((type(self.shuConfig.parse_aprs_fixed_position[parameter]['range'])) == slice and len(aprs_package) >= self.shuConfig.parse_aprs_fixed_position[parameter]['range'].stop) or\
-                    ((type(self.shuConfig.parse_aprs_fixed_position[parameter]['range'])) == int and len(aprs_package) >= self.shuConfig.parse_aprs_fixed_position[parameter]['range']):
-                aprs_telemetry[parameter] = self.shuConfig.parse_aprs_fixed_position[parameter]['parse_function'](aprs_package[self.shuConfig.parse_aprs_fixed_position[parameter]['range']])
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" parsed ({aprs_telemetry[parameter]})')
+            if parameter in self.shuConfig.parse_aprs_optional:
+                aprs_telemetry[parameter] = definition['parse_function'](comment[start_index:end_index])
+                self.loggerObj.debug_detail('Parameter "%s" parsed (%s)', parameter, aprs_telemetry[parameter])
+                # Once the radiosonde type is known, only the optional APRS telemetry parameters of its profile are considered
+                if parameter == 'type':
+                    prefixes = self.parse_profiles.get(aprs_telemetry['type'], self.parse_profile_default)['prefixes']
             else:
-                raise Exception
+                # Optional multivalue APRS telemetry parameters contain a list of subparameters
+                # The subparameters are parsed using the subparameter parse function
+                subparameter_list = definition['subparameter_parse_function'](definition['parse_function'](comment[start_index:end_index]))
+                for i in range(len(definition['subparameter'])):
+                    aprs_telemetry[definition['subparameter'][i]] = subparameter_list[i]
+                    self.loggerObj.debug_detail('Subparameter "%s" parsed (%s)', definition['subparameter'][i], subparameter_list[i])
+                self.loggerObj.debug_detail('Parameter "%s" parsed', parameter)
         except Exception:
             self.loggerObj.error(f'Error parsing parameter "{parameter}"')
 
-    # From now on it is easier to work with the APRS package cast to a string
-    aprs_package_string = str(aprs_package)
-
-    # Second, the optional APRS telemetry parameters are parsed
-    # Go through all possible optional APRS telemetry parameters
-    for parameter in self.shuConfig.parse_aprs_optional:
-        # The APRS package string is searched for the key of the optional parameter
-        start_index = self.utils.aprs_package_string_find_key(aprs_package_string, self.shuConfig.parse_aprs_optional[parameter]['prefix'])
-        # 'aprs_package_string_find_key' will return the first index of the value if the key was found
-        if start_index != -1:
-            # For parsing, the end index of the value needs to be found as well
-            end_index = aprs_package_string[start_index:].find(self.shuConfig.parse_aprs_optional[parameter]['unit_end']) + start_index
-            # End index will be start index - 1 if it was not found
-            # In that case the APRS telemetry parameter is the last one in the APRS package string
-            if end_index < start_index:
-                # The end index is therefore set to the last index in the APRS package string
-                end_index = len(aprs_package_string)-1
-            # The actual parsing is again done using the parse function
-            try:
-                aprs_telemetry[parameter] = self.shuConfig.parse_aprs_optional[parameter]['parse_function'](aprs_package_string[start_index:end_index])
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" parsed ({aprs_telemetry[parameter]})')
-            except Exception:
-                self.loggerObj.error(f'Error parsing parameter "{parameter}"')
-        else:
-            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in APRS package')
-
-    # Third, the optional multivalue APRS telemetry parameters are parsed
-    # Go through all possible optional multivalue APRS telemetry parameters
-    for parameter in self.shuConfig.parse_aprs_optional_multivalue:
-        # Finding the start and end index of the value is not different compared to the optional APRS telemetry parameters
-        start_index = self.utils.aprs_package_string_find_key(aprs_package_string, self.shuConfig.parse_aprs_optional_multivalue[parameter]['prefix'])
-        if start_index != -1:
-            end_index = aprs_package_string[start_index:].find(self.shuConfig.parse_aprs_optional_multivalue[parameter]['unit_end']) + start_index
-            # End index will be start index - 1 if it was not found
-            # In that case the APRS telemetry parameter is the last one in the APRS package string
-            if end_index < start_index:
-                # The end index is therefore set to the last index in the APRS package string
-                end_index = len(aprs_package_string) - 1
-            # The actual parsing is different compared to the optional APRS telemetry parameters
-            # Optional multivalue APRS telemetry parameters contain a list of subparameters
-            # The subparameters are parsed using the subparameter parse function
-            try:
-                subparameter_list = self.shuConfig.parse_aprs_optional_multivalue[parameter]['subparameter_parse_function'](self.shuConfig.parse_aprs_optional_multivalue[parameter]['parse_function'](aprs_package_string[start_index:end_index]))
-                for i in range(len(self.shuConfig.parse_aprs_optional_multivalue[parameter]['subparameter'])):
-                    aprs_telemetry[self.shuConfig.parse_aprs_optional_multivalue[parameter]['subparameter'][i]] = subparameter_list[i]
-                    self.loggerObj.debug_detail(f'Subparameter "{self.shuConfig.parse_aprs_optional_multivalue[parameter]["subparameter"][i]}" parsed ({aprs_telemetry[self.shuConfig.parse_aprs_optional_multivalue[parameter]["subparameter"][i]]})')
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" parsed')
-            except Exception:
-                self.loggerObj.error(f'Error parsing parameter "{parameter}"')
-        else:
-            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in APRS package')
-
     # Finally, one last optional special APRS telemetry parameter has to be parsed
     # The frequency APRS telemetry parameter does not have a prefix
     # It only has a unit attached to it (MHz)
     # In order to parse this, the unit is searched first instead of a prefix
-    end_index = aprs_package_string.find(self.shuConfig.parse_aprs_optional_special['frequency']['unit_end'])
+    end_index = comment.find(self.shuConfig.parse_aprs_optional_special['frequency']['unit_end'])
     if end_index != -1:
         # Then the beginning of the frequency APRS telemetry parameter is searched
         # This is done using a reverse search for the first space character, starting at the unit of the frequency APRS telemetry parameter
-        start_index = aprs_package_string[:end_index].rfind(self.shuConfig.parse_aprs_optional_special['frequency']['prefix']) + 1
+        start_index = comment.rfind(self.shuConfig.parse_aprs_optional_special['frequency']['prefix'], 0, end_index) + 1
         # The actual parsing is again done using the parse function
         try:
-            aprs_telemetry[list(self.shuConfig.parse_aprs_optional_special.keys())[0]] = self.shuConfig.parse_aprs_optional_special['frequency']['parse_function'](aprs_package_string[start_index:end_index])
-            self.loggerObj.debug_detail(f'Parameter "{list(self.shuConfig.parse_aprs_optional_special.keys())[0]}" parsed ({aprs_telemetry[list(self.shuConfig.parse_aprs_optional_special.keys())[0]]})')
+            aprs_telemetry['frequency'] = self.shuConfig.parse_aprs_optional_special['frequency']['parse_function'](comment[start_index:end_index])
+            self.loggerObj.debug_detail('Parameter "frequency" parsed (%s)', aprs_telemetry['frequency'])
         except Exception:
-            self.loggerObj.error(f'Error parsing parameter "{list(self.shuConfig.parse_aprs_optional_special.keys())[0]}"')
+            self.loggerObj.error('Error parsing parameter "frequency"')
     return aprs_telemetry
 
 
+# Create the parse profiles for all radiosonde types
+# A parse profile holds the optional APRS telemetry parameters and the telemetry parameters that apply to a radiosonde type
+# The profiles are stored by every type that might be contained in an APRS package (radiosonde names and subtypes)
+def create_parse_profiles(self):
+    with compiled_parsers_lock:
+        if 'parse_profiles' not in compiled_parsers:
+            parse_profiles = {}
+            for name in self.shuConfig.radiosonde:
+                profile = create_parse_profile(self, name)
+                parse_profiles[name] = profile
+                if self.shuConfig.radiosonde[name]['subtype'] is not None:
+                    for subtype in self.shuConfig.radiosonde[name]['subtype']:
+                        parse_profiles[subtype] = profile
+            # The default profile is used as long as the radiosonde type is unknown (or if it is not a known one)
+            compiled_parsers['parse_profiles'] = (parse_profiles, create_parse_profile(self, None))
+    self.parse_profiles, self.parse_profile_default = compiled_parsers['parse_profiles']
+
+
+# Create the parse profile for a single radiosonde
+# If no radiosonde name is provided, the profile contains all parameters
+def create_parse_profile(self, name):
+    # Find all optional (multivalue) APRS telemetry parameters that don't apply to the radiosonde
+    # For multivalue APRS telemetry parameters, their subparameters don't apply either
+    excluded = set()
+    if name is not None:
+        for parameter in self.shuConfig.parse_aprs_optional_applicability:
+            if name not in self.shuConfig.parse_aprs_optional_applicability[parameter]:
+                excluded.add(parameter)
+                if parameter in self.shuConfig.parse_aprs_optional_multivalue:
+                    excluded.update(self.shuConfig.parse_aprs_optional_multivalue[parameter]['subparameter'])
+    return {
+        # Maps the prefix of every applicable optional (multivalue) APRS telemetry parameter to the parameter itself
+        'prefixes': {prefix: parameter for prefix, parameter in self.shuConfig.parse_aprs_optional_prefixes.items() if parameter not in excluded},
+        # The APRS unification plan for all telemetry parameters whose APRS source applies
+        'unification_plan': create_unification_plan_aprs(self, [parameter for parameter in self.shuConfig.telemetry if self.shuConfig.telemetry[parameter]['aprs_source'] not in excluded])
+    }
+
+
+# Decode all APRS telemetry parameters with fixed positions inside an APRS package at once
+# Returns None if the APRS package is too short or any of the parameters is invalid
+def parse_aprs_fixed_position(self, aprs_package):
+    # The length of the APRS package only has to be checked once
+    if len(aprs_package) < self.shuConfig.parse_aprs_fixed_position_struct.size:
+        return None
+    try:
+        (destination_address, source_address, control_field, protocol_id, data_type, serial, hour, minute, second, time_format,
+         latitude_degree, latitude_minute, latitude_ns, longitude_degree, longitude_minute, longitude_we, course, speed, altitude,
+         dao_D, dao_A, dao_O) = self.shuConfig.parse_aprs_fixed_position_struct.unpack_from(aprs_package)
+        # The parameters are converted just like the parse functions in 'parse_aprs_fixed_position' do
+        return {
+            'destination_address': parse_aprs_address(destination_address),
+            'source_address': parse_aprs_address(source_address),
+            'control_field': hex(control_field),
+            'protocol_id': hex(protocol_id),
+            'data_type': chr(data_type),
+            'serial': serial.decode('utf-8').split(' ', 1)[0],
+            'hour': int(hour),
+            'minute': int(minute),
+            'second': int(second),
+            'time_format': chr(time_format),
+            'latitude_degree': int(latitude_degree),
+            'latitude_minute': parse_aprs_gmm_minute(latitude_minute.decode('utf-8')),
+            'latitude_ns': chr(latitude_ns),
+            'longitude_degree': int(longitude_degree),
+            'longitude_minute': parse_aprs_gmm_minute(longitude_minute.decode('utf-8')),
+            'longitude_we': chr(longitude_we),
+            'course': int(course),
+            'speed': int(speed),
+            'altitude': int(altitude),
+            'dao_D': dao_D,
+            'dao_A': dao_A,
+            'dao_O': dao_O
+        }
+    except Exception:
+        return None
+
+
+# Parse the APRS telemetry parameters with fixed positions inside an APRS package one by one
+# This also logs which parameters could not be parsed
+def parse_aprs_fixed_position_single(self, aprs_package, aprs_telemetry):
+    # Go through all possible APRS telemetry parameters with fixed positions
+    for parameter in self.shuConfig.parse_aprs_fixed_position:
+        # The actual parsing is done using the parse function
+        try:
+            # Check whether the APRS package actually contains the indices for the APRS telemetry parameters
+            if ((type(self.shuConfig.parse_aprs_fixed_position[parameter]['range'])) == slice and len(aprs_package) >= self.shuConfig.parse_aprs_fixed_position[parameter]['range'].stop) or\
+                    ((type(self.shuConfig.parse_aprs_fixed_position[parameter]['range'])) == int and len(aprs_package) >= self.shuConfig.parse_aprs_fixed_position[parameter]['range']):
+                aprs_telemetry[parameter] = self.shuConfig.parse_aprs_fixed_position[parameter]['parse_function'](aprs_package[self.shuConfig.parse_aprs_fixed_position[parameter]['range']])
+                self.loggerObj.debug_detail(f'Parameter "{parameter}" parsed ({aprs_telemetry[parameter]})')
+            else:
+                raise Exception
+        except Exception:
+            self.loggerObj.error(f'Error parsing parameter "{parameter}"')
+
+
 # Parse the destination/source address of an APRS package
+# The addresses are the same for every package of a receiver, so the result is cached
+@caches.cached
 def parse_aprs_address(address):
-    address_string = ''
     # The address is ASCII-coded and 6 characters long
     # But only MSB to LSB+1 of each byte contains the ASCII character
     # The LSB is the address extension bit, which can be ignored in this case
-    for i in range(len(address) - 1):
-        address_string += chr(address[i] >> 1)
+    # All characters are converted at once using the translation table
+    address_string = address[:-1].translate(aprs_address_table).decode('ascii')
     # The last byte contains the SSID and a few additional bits
     # The last byte has the following structure: CRRSSSSX
     # C = command/response bit
@@ -113,7 +216,7 @@ def parse_aprs_address(address):
     # S = SSID bit
     # X = address extension bit
     # In this case, all bits but the SSID bits can be ignored
-    address_string += '-' + str(int(format(address[len(address) - 1], '08b')[3:7], 2))
+    address_string += '-' + str(address[-1] >> 1 & 0x0F)
     return address_string
 
 
@@ -175,45 +278,24 @@ def parse_aprs_pump(pump_string):
 
 # Unify JSON telemetry
 def unify_json(self, json_telemetry):
-    unified_telemetry = {}
-
-    # Go through all possible telemetry parameters
-    for parameter in self.shuConfig.telemetry:
-        try:
-            # Check whether the telemetry parameter actually exists in JSON telemetry
-            if self.shuConfig.telemetry[parameter]['json_source'] is not None:
-                # Check whether the data type of the JSON source of the telemetry parameter is string, list or tuple
-                if type(self.shuConfig.telemetry[parameter]['json_source']) == str:
-                    # Telemetry parameters with a string JSON source can be unified directly using the JSON conversion function
-                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](json_telemetry[self.shuConfig.telemetry[parameter]['json_source']])
-                elif type(self.shuConfig.telemetry[parameter]['json_source']) == list:
-                    # Telemetry parameters with a list JSON source are contained within a sub-dictionary
-                    # The list JSON source provides the keys necessary to access the telemetry parameter within the sub-dictionary
-                    # Other than that, the telemetry parameters can be unified directly using the JSON conversion function
-                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](json_telemetry[self.shuConfig.telemetry[parameter]['json_source'][0]][self.shuConfig.telemetry[parameter]['json_source'][1]])
-                elif type(self.shuConfig.telemetry[parameter]['json_source']) == tuple:
-                    # Telemetry parameters with a tuple JSON source can be sourced from multiple JSON telemetry parameters
-                    # These JSON telemetry parameters are compiled in a parameter list
-                    parameter_list = []
-                    for element in self.shuConfig.telemetry[parameter]['json_source']:
-                        # The individual JSON telemetry parameters of type string or list (see above)
-                        if type(element) == str:
-                            parameter_list.append(json_telemetry[element] if element in json_telemetry else None)
-                        elif type(element) == list:
-                            parameter_list.append(
-                                json_telemetry[element[0]][element[1]] if element[0] in json_telemetry and element[1] in json_telemetry[element[0]] else None)
-                    # Source selection and unification are done by the JSON conversion function
-                    # The JSON conversion function will return None in case of an error
-                    if self.shuConfig.telemetry[parameter]['json_conversion_function'](*parameter_list) is not None:
-                        unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](*parameter_list)
-                    else:
-                        # Raise a KeyError in order to get a proper debug message (see below)
-                        raise KeyError
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" unified')
-            else:
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" does not exist in JSON telemetry')
-        except KeyError:
-            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in JSON telemetry')
+    unified_telemetry = self.shuConfig.unified_telemetry_record()
+    # The plans hold the field indices of the telemetry parameters, so the values can be set directly
+    values = unified_telemetry.values
+
+    # The unification is done using the JSON unification plan (see 'create_unification_plan_json')
+    # Telemetry parameters with a single JSON source can be unified directly using the JSON conversion function
+    for index, getter, conversion_function in self.unification_plan_json['single']:
+        value = getter(json_telemetry)
+        if value is not missing:
+            values[index] = conversion_function(value)
+    # Telemetry parameters with multiple JSON sources must be compiled from multiple JSON telemetry parameters
+    # Source selection and unification are done by the JSON conversion function
+    # The JSON conversion function will return None in case of an error
+    for index, getters, conversion_function in self.unification_plan_json['multiple']:
+        value = conversion_function(*[getter(json_telemetry) for getter in getters])
+        if value is not None:
+            values[index] = value
+    self.loggerObj.debug_detail('%d parameters unified', len(unified_telemetry))
     return unified_telemetry
 
 
@@ -259,106 +341,120 @@ def unify_json_burst_timer(bursttx, txoff):
 
 # Unify APRS telemetry
 def unify_aprs(self, aprs_telemetry):
-    unified_telemetry = {}
+    unified_telemetry = self.shuConfig.unified_telemetry_record()
+    # The plans hold the field indices of the telemetry parameters, so the values can be set directly
+    values = unified_telemetry.values
+
+    # Only the telemetry parameters of the profile of the radiosonde type are considered
+    profile = self.parse_profiles.get(aprs_telemetry['type'], self.parse_profile_default) if 'type' in aprs_telemetry else self.parse_profile_default
+    # The unification is done using the APRS unification plan of the profile (see 'create_unification_plan_aprs')
+    # Telemetry parameters with a single APRS source can be unified directly using the APRS conversion function
+    for index, source, conversion_function in profile['unification_plan']['single']:
+        if source in aprs_telemetry:
+            values[index] = conversion_function(aprs_telemetry[source])
+    # Telemetry parameters with multiple APRS sources must be compiled from multiple APRS telemetry parameters
+    # Compiling and unification are done by the APRS conversion function
+    # The APRS conversion function will return None in case of an error
+    for index, sources, conversion_function in profile['unification_plan']['multiple']:
+        value = conversion_function(*[aprs_telemetry.get(source) for source in sources])
+        if value is not None:
+            values[index] = value
+    self.loggerObj.debug_detail('%d parameters unified', len(unified_telemetry))
+    return unified_telemetry
 
-    # Go through all possible telemetry parameters
+
+# Create the JSON unification plan
+# The plan is created only once, so there is no need to check the types of the JSON sources for every package
+# 'single' holds the telemetry parameters with a single JSON source, along with a getter and the JSON conversion function
+# 'multiple' holds the telemetry parameters with multiple JSON sources, along with a getter for every source and the JSON conversion function
+# The telemetry parameters are stored by their field index in the unified telemetry record
+def create_unification_plan_json(self):
+    with compiled_parsers_lock:
+        if 'unification_plan_json' not in compiled_parsers:
+            compiled_parsers['unification_plan_json'] = compile_unification_plan_json(self)
+    self.unification_plan_json = compiled_parsers['unification_plan_json']
+
+
+# Compile the JSON unification plan (see 'create_unification_plan_json')
+def compile_unification_plan_json(self):
+    unification_plan_json = {'single': [], 'multiple': []}
     for parameter in self.shuConfig.telemetry:
-        try:
-            # Check whether the telemetry parameter actually exists in APRS telemetry
-            if self.shuConfig.telemetry[parameter]['aprs_source'] is not None:
-                # Check whether the data type of the APRS source of the telemetry parameter is string or tuple
-                if type(self.shuConfig.telemetry[parameter]['aprs_source']) == str:
-                    # Telemetry parameters with a string APRS source can be unified directly using the APRS conversion function
-                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['aprs_conversion_function'](aprs_telemetry[self.shuConfig.telemetry[parameter]['aprs_source']])
-                elif type(self.shuConfig.telemetry[parameter]['aprs_source']) == tuple:
-                    # Telemetry parameters with a tuple APRS source must be compiled from multiple APRS telemetry parameters
-                    # These APRS telemetry parameters are compiled in a parameter list
-                    parameter_list = []
-                    for element in self.shuConfig.telemetry[parameter]['aprs_source']:
-                        parameter_list.append(aprs_telemetry[element] if element in aprs_telemetry else None)
-                    # Compiling and unification are done by the APRS conversion function
-                    # The APRS conversion function will return None in case of an error
-                    if self.shuConfig.telemetry[parameter]['aprs_conversion_function'](*parameter_list) is not None:
-                        unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['aprs_conversion_function'](*parameter_list)
-                    else:
-                        # Raise a KeyError in order to get a proper debug message (see below)
-                        raise KeyError
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" unified')
-            else:
-                self.loggerObj.debug_detail(f'Parameter "{parameter}" does not exist in APRS telemetry')
-        except KeyError:
-            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in APRS telemetry')
-    return unified_telemetry
+        index = self.shuConfig.unified_telemetry_record.index[parameter]
+        source = self.shuConfig.telemetry[parameter]['json_source']
+        # Telemetry parameters without a JSON source don't exist in JSON telemetry
+        if source is None:
+            continue
+        if type(source) == tuple:
+            # Getters for multiple sources return None if the JSON telemetry parameter is missing
+            getters = tuple(create_json_getter(element, None) for element in source)
+            unification_plan_json['multiple'].append((index, getters, self.shuConfig.telemetry[parameter]['json_conversion_function']))
+        else:
+            unification_plan_json['single'].append((index, create_json_getter(source, missing), self.shuConfig.telemetry[parameter]['json_conversion_function']))
+    return unification_plan_json
+
+
+# Create a getter for a JSON source
+# The getter returns the default value if the JSON telemetry parameter is missing
+def create_json_getter(source, default):
+    # A string JSON source is the key of the JSON telemetry parameter
+    if type(source) == str:
+        return lambda json_telemetry: json_telemetry.get(source, default)
+    # A list JSON source provides the keys necessary to access the JSON telemetry parameter within a sub-dictionary
+    return lambda json_telemetry: json_telemetry[source[0]].get(source[1], default) if source[0] in json_telemetry else default
+
+
+# Create the APRS unification plan for a list of telemetry parameters
+# 'single' holds the telemetry parameters with a single APRS source, along with the source and the APRS conversion function
+# 'multiple' holds the telemetry parameters with multiple APRS sources, along with the sources and the APRS conversion function
+# The telemetry parameters are stored by their field index in the unified telemetry record
+def create_unification_plan_aprs(self, parameters):
+    unification_plan = {'single': [], 'multiple': []}
+    for parameter in parameters:
+        index = self.shuConfig.unified_telemetry_record.index[parameter]
+        source = self.shuConfig.telemetry[parameter]['aprs_source']
+        # Telemetry parameters without an APRS source don't exist in APRS telemetry
+        if source is None:
+            continue
+        if type(source) == tuple:
+            unification_plan['multiple'].append((index, source, self.shuConfig.telemetry[parameter]['aprs_conversion_function']))
+        else:
+            unification_plan['single'].append((index, source, self.shuConfig.telemetry[parameter]['aprs_conversion_function']))
+    return unification_plan
 
 
 # Reformat the unified telemetry to the SondeHub telemetry format
 # Source: https://github.com/projecthorus/sondehub-infra/wiki/SondeHub-Telemetry-Format
-def reformat_telemetry(self, unified_telemetry):
-    # Create a dictionary for the reformatted telemetry
+# 'name' is the name of the radiosonde resolved for the unified telemetry
+def reformat_telemetry(self, unified_telemetry, name):
+    # Create a record for the reformatted telemetry
+    # Reformatted telemetry might stay in the upload queue for quite some time, so it is kept as compact as possible
+    # Strings that are the same for many packages (callsign, type, subtype, serial) are interned, so all packages share them
+    reformatted_telemetry = self.shuConfig.reformatted_telemetry_record()
     # At first, some data that is only station- and software-specific is added
-    reformatted_telemetry = {
-        'software_name': self.shuConfig.software_name,
-        'software_version': self.shuConfig.software_version,
-        'uploader_callsign': self.call if self.call is not None else unified_telemetry['source_address'],
-        'uploader_position': [round(self.pos[0], 5), round(self.pos[1], 5), round(self.pos[2], 1)],
-        'uploader_antenna': self.ant,
-        'time_received': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-    }
+    reformatted_telemetry['software_name'] = self.shuConfig.software_name
+    reformatted_telemetry['software_version'] = self.shuConfig.software_version
+    reformatted_telemetry['uploader_callsign'] = self.call if self.call is not None else sys.intern(unified_telemetry['source_address'])
+    # The uploader position is the same for all packages, so it is only rounded once
+    reformatted_telemetry['uploader_position'] = self.uploader_position
+    reformatted_telemetry['uploader_antenna'] = self.ant
+    reformatted_telemetry['time_received'] = timestamp.format_datetime(clock.now())
 
     # Second, mandatory radiosonde-specific reformatted telemetry parameters are added
-    # Go through all possible radiosonde types
-    for name in self.shuConfig.radiosonde:
-        # The radiosonde type/subtype is compared in order to find a match
-        if unified_telemetry['type'] == name or\
-                (self.shuConfig.radiosonde[name]['subtype'] is not None and unified_telemetry['type'] in self.shuConfig.radiosonde[name]['subtype']):
-            # manufacturer and type can be transferred directly
-            reformatted_telemetry['manufacturer'] = self.shuConfig.radiosonde[name]['manufacturer']
-            # Check whether the provided type matches the type
-            if unified_telemetry['type'] == self.shuConfig.radiosonde[name]['type']:
-                # In that case, this is the only type available (no subtype)
-                reformatted_telemetry['type'] = unified_telemetry['type']
-            # In any other case the provided type matches the subtype
-            else:
-                # In that case, the subtype is set accordingly and the type is taken from the radiosonde table
-                reformatted_telemetry['subtype'] = unified_telemetry['type']
-                reformatted_telemetry['type'] = self.shuConfig.radiosonde[name]['type']
-            # For IMET radiosondes a unique serial must be calculated (based on the convention of SondeHub)
-            if self.shuConfig.radiosonde[name]['serial'] == 'IMET':
-                # The date provided by the radiosonde is used (if it is available)
-                if 'date' in unified_telemetry:
-                    # Date and time are combined in a datetime object
-                    _datetime = datetime.datetime.combine(unified_telemetry['date'], unified_telemetry['time'])
-                # Otherwise the system date is used
-                else:
-                    _datetime = self.utils.generate_datetime(self, unified_telemetry['time'])
-                # The leap seconds need to be factored in
-                # The leap seconds provided by the radiosonde are used (if they are available)
-                if 'leap_seconds' in unified_telemetry:
-                    _datetime += datetime.timedelta(seconds=unified_telemetry['leap_seconds'])
-                # Otherwise the hardcoded leap seconds are used
-                else:
-                    _datetime += datetime.timedelta(seconds=self.shuConfig.leap_seconds)
-                # The IMET unique serial is calculated based on the datetime, framenumber and frequency
-                reformatted_telemetry['serial'] = self.utils.imet_unique_serial(self, _datetime, unified_telemetry['framenumber'], unified_telemetry['frequency']).split('-')[1]
-            # For all other radiosondes, the serial can be transferred directly
-            else:
-                serial = unified_telemetry[self.shuConfig.radiosonde[name]['serial'][0]][self.shuConfig.radiosonde[name]['serial'][1]:]
-                # For M10 radiosondes, the serial provided by dxlAPRS might be faulty in recent versions of sondemod
-                # Therefore the serial is calculated based on the APRS serial that dxlAPRS provides
-                # This provides a workaround for the bug in recent versions of sondemod
-                # A special thank you goes to Vigor G. from France, who helped implementing this workaround
-                if reformatted_telemetry['type'] == 'M10':
-                    rs_serial = 0
-                    for i in range(4):
-                        rs_serial += int(serial[5 + i], 16) * 16 ** (3 - i)
-                    reformatted_telemetry['serial'] = serial[2] + '{:02d}'.format(int(serial[3], 16)) + '-' + serial[4] + '-' + '{:1d}'.format(rs_serial >> 13) + '{:04d}'.format(rs_serial & 0x1FFF)
-                # For M20 radiosondes, the serial might have some sort of number in square brackets attached
-                # This needs to me removed
-                elif reformatted_telemetry['type'] == 'M20':
-                    reformatted_telemetry['serial'] = serial.split('[', 1)[0]
-                # For all other radiosondes, the serial can be transferred directly
-                else:
-                    reformatted_telemetry['serial'] = serial
+    # The radiosonde has already been resolved, so there is no need to search the radiosonde table
+    if name is not None:
+        # manufacturer and type can be transferred directly
+        reformatted_telemetry['manufacturer'] = self.shuConfig.radiosonde[name]['manufacturer']
+        # Check whether the provided type matches the type
+        if unified_telemetry['type'] == self.shuConfig.radiosonde[name]['type']:
+            # In that case, this is the only type available (no subtype)
+            reformatted_telemetry['type'] = self.shuConfig.radiosonde[name]['type']
+        # In any other case the provided type matches the subtype
+        else:
+            # In that case, the subtype is set accordingly and the type is taken from the radiosonde table
+            reformatted_telemetry['subtype'] = sys.intern(unified_telemetry['type'])
+            reformatted_telemetry['type'] = self.shuConfig.radiosonde[name]['type']
+        # For IMET radiosondes a unique serial must be calculated (based on the convention of SondeHub)
+        if self.shuConfig.radiosonde[name]['serial'] == 'IMET':
             # The date provided by the radiosonde is used (if it is available)
             if 'date' in unified_telemetry:
                 # Date and time are combined in a datetime object
@@ -366,56 +462,92 @@ def reformat_telemetry(self, unified_telemetry):
             # Otherwise the system date is used
             else:
                 _datetime = self.utils.generate_datetime(self, unified_telemetry['time'])
-            # The leap seconds might need to be factored in
+            # The leap seconds need to be factored in
             # The leap seconds provided by the radiosonde are used (if they are available)
             if 'leap_seconds' in unified_telemetry:
-                # The leap seconds must only be factored in in some cases
-                # This depends on the time reference of the radiosonde and the time reference used by SondeHub (UTC or GPS)
-                # Then sometimes the leap seconds provided by the radiosonde can be used
-                # While in other cases the hardcoded leap seconds have to be used
-                # The reasons for that are perhaps somewhat difficult to fathom
-                # The time provided by dxlAPRS is always UTC
-                # And the leap seconds provided by dxlAPRS are the leap seconds that were applied in order to get the time in UTC
-                # One example: If the radiosonde time reference is GPS, dxlAPRS has to (currently) add 18 leap seconds in order to get UTC
-                # That means the leap seconds provided by dxlAPRS will be 18
-                # Another example: If the radiosonde time reference is UTC, dxlAPRS must not add any leap seconds
-                # That means the leap seconds provided by dxlAPRS will be 0
-                # With this background knowledge, you should be able to understand the following lines
-                # Take some time to think this through carefully - it's quite a brainfuck
-                if self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == self.shuConfig.radiosonde[name]['sondehub_time_reference']:
-                    _datetime += datetime.timedelta(seconds=unified_telemetry['leap_seconds'])
-                elif self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'UTC' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
-                    _datetime += datetime.timedelta(seconds=self.shuConfig.leap_seconds)
+                _datetime += datetime.timedelta(seconds=unified_telemetry['leap_seconds'])
             # Otherwise the hardcoded leap seconds are used
             else:
-                # The leap seconds must only be factored in when the SondeHub time reference is GPS
-                # This is due to the fast that the time provided by dxlAPRS is always UTC
-                if self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
-                    _datetime += datetime.timedelta(seconds=self.shuConfig.leap_seconds)
-            # A datetime string is generated from the datetime
-            reformatted_telemetry['datetime'] = _datetime.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            # For most radiosondes, the framenumber can be transferred directly
-            if self.shuConfig.radiosonde[name]['framenumber'] == 'fn':
-                reformatted_telemetry['frame'] = unified_telemetry['framenumber']
-            # But some radiosondes do not transmit a framenumber
-            # In this case the GPS seconds (Seconds since 01/06/1980) are used as the framenumber
-            elif self.shuConfig.radiosonde[name]['framenumber'] == 'gps':
-                reformatted_telemetry['frame'] = int((datetime.datetime.strptime(reformatted_telemetry['datetime'], '%Y-%m-%dT%H:%M:%S.%fZ') - datetime.datetime(1980, 1, 6, 0, 0, 0)).total_seconds())
-                # The leap seconds might need to be factored in here as well
-                # This depends on the time reference used by the radiosonde and the time reference used by SondeHub
-                # If they both match, nothing needs to be done
-                # If they are different, the leap seconds must be either added or subtracted
-                if self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'GPS' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'UTC':
-                    reformatted_telemetry['frame'] += unified_telemetry['leap_seconds'] if 'leap_seconds' in unified_telemetry else self.shuConfig.leap_seconds
-                elif self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'UTC' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
-                    reformatted_telemetry['frame'] -= unified_telemetry['leap_seconds'] if 'leap_seconds' in unified_telemetry else self.shuConfig.leap_seconds
-            # The altitude is provided with a radiosonde-specific precision
-            reformatted_telemetry['alt'] = float(round(unified_telemetry['altitude'], self.shuConfig.radiosonde[name]['altitude_precision']))
-            # ref_datetime and ref_position can be transferred directly
-            reformatted_telemetry['ref_datetime'] = self.shuConfig.radiosonde[name]['sondehub_time_reference']
-            reformatted_telemetry['ref_position'] = self.shuConfig.radiosonde[name]['sondehub_position_reference']
-            # Break out of for-loop after the first match because only a single match is expected
-            break
+                _datetime += datetime.timedelta(seconds=self.shuConfig.leap_seconds)
+            # The IMET unique serial is calculated based on the datetime, framenumber and frequency
+            reformatted_telemetry['serial'] = self.utils.imet_unique_serial(self, _datetime, unified_telemetry['framenumber'], unified_telemetry['frequency']).split('-')[1]
+        # For all other radiosondes, the serial can be transferred directly
+        else:
+            serial = unified_telemetry[self.shuConfig.radiosonde[name]['serial'][0]][self.shuConfig.radiosonde[name]['serial'][1]:]
+            # For M10 radiosondes, the serial provided by dxlAPRS might be faulty in recent versions of sondemod
+            # Therefore the serial is calculated based on the APRS serial that dxlAPRS provides
+            # This provides a workaround for the bug in recent versions of sondemod
+            # A special thank you goes to Vigor G. from France, who helped implementing this workaround
+            if reformatted_telemetry['type'] == 'M10':
+                reformatted_telemetry['serial'] = reformat_m10_serial(serial)
+            # For M20 radiosondes, the serial might have some sort of number in square brackets attached
+            # This needs to me removed
+            elif reformatted_telemetry['type'] == 'M20':
+                reformatted_telemetry['serial'] = serial.split('[', 1)[0]
+            # For all other radiosondes, the serial can be transferred directly
+            else:
+                reformatted_telemetry['serial'] = serial
+        reformatted_telemetry['serial'] = sys.intern(reformatted_telemetry['serial'])
+        # The date provided by the radiosonde is used (if it is available)
+        if 'date' in unified_telemetry:
+            # Date and time are combined in a datetime object
+            _datetime = datetime.datetime.combine(unified_telemetry['date'], unified_telemetry['time'])
+        # Otherwise the system date is used
+        else:
+            _datetime = self.utils.generate_datetime(self, unified_telemetry['time'])
+        # From here on, the datetime is handled as GPS seconds (seconds since 01/06/1980) and microseconds
+        # This way the leap seconds can be factored in using integer arithmetic
+        seconds = timestamp.gps_seconds(_datetime)
+        microsecond = _datetime.microsecond
+        # The leap seconds might need to be factored in
+        # The leap seconds provided by the radiosonde are used (if they are available)
+        if 'leap_seconds' in unified_telemetry:
+            # The leap seconds must only be factored in in some cases
+            # This depends on the time reference of the radiosonde and the time reference used by SondeHub (UTC or GPS)
+            # Then sometimes the leap seconds provided by the radiosonde can be used
+            # While in other cases the hardcoded leap seconds have to be used
+            # The reasons for that are perhaps somewhat difficult to fathom
+            # The time provided by dxlAPRS is always UTC
+            # And the leap seconds provided by dxlAPRS are the leap seconds that were applied in order to get the time in UTC
+            # One example: If the radiosonde time reference is GPS, dxlAPRS has to (currently) add 18 leap seconds in order to get UTC
+            # That means the leap seconds provided by dxlAPRS will be 18
+            # Another example: If the radiosonde time reference is UTC, dxlAPRS must not add any leap seconds
+            # That means the leap seconds provided by dxlAPRS will be 0
+            # With this background knowledge, you should be able to understand the following lines
+            # Take some time to think this through carefully - it's quite a brainfuck
+            if self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == self.shuConfig.radiosonde[name]['sondehub_time_reference']:
+                seconds, microsecond = timestamp.add_seconds(seconds, microsecond, unified_telemetry['leap_seconds'])
+            elif self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'UTC' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
+                seconds, microsecond = timestamp.add_seconds(seconds, microsecond, self.shuConfig.leap_seconds)
+        # Otherwise the hardcoded leap seconds are used
+        else:
+            # The leap seconds must only be factored in when the SondeHub time reference is GPS
+            # This is due to the fast that the time provided by dxlAPRS is always UTC
+            if self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
+                seconds, microsecond = timestamp.add_seconds(seconds, microsecond, self.shuConfig.leap_seconds)
+        # A datetime string is generated from the GPS seconds and microseconds
+        reformatted_telemetry['datetime'] = timestamp.format_iso(seconds, microsecond)
+        # For most radiosondes, the framenumber can be transferred directly
+        if self.shuConfig.radiosonde[name]['framenumber'] == 'fn':
+            reformatted_telemetry['frame'] = unified_telemetry['framenumber']
+        # But some radiosondes do not transmit a framenumber
+        # In this case the GPS seconds (Seconds since 01/06/1980) are used as the framenumber
+        # They are already available, so there is no need to parse the datetime string again
+        elif self.shuConfig.radiosonde[name]['framenumber'] == 'gps':
+            reformatted_telemetry['frame'] = seconds
+            # The leap seconds might need to be factored in here as well
+            # This depends on the time reference used by the radiosonde and the time reference used by SondeHub
+            # If they both match, nothing needs to be done
+            # If they are different, the leap seconds must be either added or subtracted
+            if self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'GPS' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'UTC':
+                reformatted_telemetry['frame'] += unified_telemetry['leap_seconds'] if 'leap_seconds' in unified_telemetry else self.shuConfig.leap_seconds
+            elif self.shuConfig.radiosonde[name]['radiosonde_time_reference'] == 'UTC' and self.shuConfig.radiosonde[name]['sondehub_time_reference'] == 'GPS':
+                reformatted_telemetry['frame'] -= unified_telemetry['leap_seconds'] if 'leap_seconds' in unified_telemetry else self.shuConfig.leap_seconds
+        # The altitude is provided with a radiosonde-specific precision
+        reformatted_telemetry['alt'] = float(round(unified_telemetry['altitude'], self.shuConfig.radiosonde[name]['altitude_precision']))
+        # ref_datetime and ref_position can be transferred directly
+        reformatted_telemetry['ref_datetime'] = self.shuConfig.radiosonde[name]['sondehub_time_reference']
+        reformatted_telemetry['ref_position'] = self.shuConfig.radiosonde[name]['sondehub_position_reference']
 
     # Thirdly, mandatory non-radiosonde-specific reformatted telemetry parameters are added
     # lat and lon can be transferred directly
@@ -434,6 +566,16 @@ def reformat_telemetry(self, unified_telemetry):
     return reformatted_telemetry
 
 
+# Reformat the APRS serial of an M10 radiosonde
+# The result is the same for every package of a radiosonde, so it is cached
+@caches.cached
+def reformat_m10_serial(serial):
+    rs_serial = 0
+    for i in range(4):
+        rs_serial += int(serial[5 + i], 16) * 16 ** (3 - i)
+    return serial[2] + '{:02d}'.format(int(serial[3], 16)) + '-' + serial[4] + '-' + '{:1d}'.format(rs_serial >> 13) + '{:04d}'.format(rs_serial & 0x1FFF)
+
+
 # Reformat the xdata of a unified telemetry
 def reformat_xdata(xdata):
     # xdata is ASCII-coded and provided as a string
@@ -0,0 +1,57 @@
+# jsonCodec.py - Functions for parsing and serialising JSON
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import json
+# Optional modules
+# orjson is a lot faster than the JSON module of the Python Standard Library, but it is not mandatory
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Parse JSON data using the Python Standard Library
+def loads_stdlib(data):
+    # The JSON module can't parse views, so the data is decoded first
+    return json.loads(str(data, 'utf-8'))
+
+
+# Serialise to JSON data using the Python Standard Library
+def dumps_stdlib(obj):
+    return json.dumps(obj, default=default).encode('utf-8')
+
+
+# Parse JSON data using orjson
+def loads_orjson(data):
+    # orjson is able to parse bytes-like objects (including views) directly
+    return orjson.loads(data)
+
+
+# Serialise to JSON data using orjson
+def dumps_orjson(obj):
+    return orjson.dumps(obj, default=default)
+
+
+# Serialise objects that are not natively supported
+# Telemetry records are serialised as JSON objects
+def default(obj):
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError
+
+
+# The backend is selected once, depending on whether orjson is installed
+# Both backends raise a 'ValueError' (or a subclass of it) for invalid JSON data
+if orjson is not None:
+    backend = 'orjson'
+    loads = loads_orjson
+    dumps = dumps_orjson
+else:
+    backend = 'json'
+    loads = loads_stdlib
+    dumps = dumps_stdlib
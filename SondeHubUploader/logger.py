@@ -12,7 +12,9 @@ import logging
 # Configure logger
 def create_logger(self, loglevelp, loglevelw, savel):
     # Define a logger
-    self.loggerObj = logging.getLogger('logger')
+    # Every instance has its own logger, so multiple instances can coexist within a process
+    # The logger is identified by the user callsign and port, along with the identity of the instance, as even these might be the same
+    self.loggerObj = logging.getLogger(f'logger.{self.call}.{self.port}.{id(self)}')
 
     # Add a custom logging level for detailed debugging
     add_logging_level('DEBUG_DETAIL', self.shuConfig.loglevel[5])
@@ -0,0 +1,147 @@
+# pipeline.py - Pipelined processing of packages in stage threads
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import queue
+import time
+
+
+# All stages of the pipeline, in the order the packages pass through them
+# 'decode': Decoding and admission (the packages are taken from the ring buffers)
+# 'validate': Plausibility checks, mandatory data check, reformatting and storing to the upload queue
+# 'persist': Writing raw data, telemetry and reformatted telemetry
+stages = ['decode', 'validate', 'persist']
+
+
+# Create the queues and statistics of the pipeline and start a thread for every stage
+def start_pipeline(self):
+    # Bounded queues for handing batches over between the stages
+    # The first stage takes its packages directly from the ring buffers, so it doesn't need a queue
+    self.stage_queues = {stage: queue.Queue(self.shuConfig.pipeline_queue_size) for stage in stages[1:]}
+    # Number of batches and packages that passed each stage, the time each stage was busy and the number of packages dropped in front of it
+    self.stage_statistics = {stage: {'batches': 0, 'packages': 0, 'busy': 0.0, 'dropped': 0} for stage in stages}
+    # The occupancy is calculated relative to the last time the statistics were logged
+    self.stage_statistics_start = time.monotonic()
+    self.threads.start_worker(self, 'decode_stage', decode_stage, (self,))
+    self.threads.start_worker(self, 'validate_stage', validate_stage, (self,))
+    self.threads.start_worker(self, 'persist_stage', persist_stage, (self,))
+
+
+# Decode packages
+def decode_stage(self):
+    while self.running:
+        packages, taken = self.threads.collect_batch(self)
+        if len(packages) == 0:
+            # Wait until a receive thread hands over new packages (or the timeout expired)
+            self.input_event.wait(self.shuConfig.thread_sleep)
+            continue
+        start = time.perf_counter()
+        # All packages of a batch are processed with the same current time
+        # It is handed over along with the batch, so the following stages use it as well
+        self.clock.tick()
+        now = self.clock.now()
+        # The packages are copied out of their slots, as they are handed over to the following stages
+        # This way the slots can be released right away
+        try:
+            packages = [(bytes(package), address) for package, address in packages]
+        finally:
+            for ring, count in zip(self.input_rings, taken):
+                ring.release(count)
+        frames = self.threads.decode_batch(self, packages)
+        # The raw data is only handed over if it is written
+        raw_data_batch = [package for package, address in packages] if self.writeo else []
+        account(self, 'decode', len(packages), start)
+        # If the next stage is busy, this stage waits, so the ring buffers take up the load
+        put(self, 'validate', (raw_data_batch, frames, now))
+
+
+# Check and reformat telemetry
+def validate_stage(self):
+    while self.running:
+        batch = get(self, 'validate')
+        if batch is None:
+            continue
+        raw_data_batch, frames, now = batch
+        start = time.perf_counter()
+        # The clock of this stage is set to the time the batch was decoded with
+        self.clock.tick(now)
+        frames, reformatted_telemetry_batch = self.threads.validate_batch(self, frames)
+        # The reformatted telemetry is stored to the upload queue right away, so writing files can't delay it
+        self.threads.put_upload_batch(self, reformatted_telemetry_batch)
+        account(self, 'validate', len(frames), start)
+        # If the persist stage can't keep up, the batch is not written, as waiting for it would delay the following batches on their way to the upload queue
+        if self.writeo or self.writet or self.writer:
+            put_nowait(self, 'persist', (raw_data_batch, [unified_telemetry for package, unified_telemetry, radiosonde in frames], reformatted_telemetry_batch))
+
+
+# Write files
+# Writing files doesn't depend on the current time, so this stage doesn't need the clock
+def persist_stage(self):
+    while self.running:
+        batch = get(self, 'persist')
+        if batch is None:
+            continue
+        start = time.perf_counter()
+        self.threads.persist_batch(self, *batch)
+        account(self, 'persist', len(batch[1]), start)
+
+
+# Put a batch in the queue of a stage
+# Waits as long as the queue is full (unless the SondeHubUploader is terminated)
+def put(self, stage, batch):
+    while self.running:
+        try:
+            self.stage_queues[stage].put(batch, True, self.shuConfig.thread_sleep)
+            return
+        except queue.Full:
+            continue
+
+
+# Put a batch in the queue of a stage without waiting
+# The batch is dropped if the queue is full
+def put_nowait(self, stage, batch):
+    try:
+        self.stage_queues[stage].put_nowait(batch)
+    except queue.Full:
+        self.stage_statistics[stage]['dropped'] += len(batch[1])
+        self.loggerObj.warning('Queue of stage %s full (%d packages dropped)', stage, len(batch[1]))
+
+
+# Get a batch from the queue of a stage
+# Returns None if there was no batch within the timeout, so the stage is able to check whether the SondeHubUploader is terminated
+def get(self, stage):
+    try:
+        return self.stage_queues[stage].get(True, self.shuConfig.thread_sleep)
+    except queue.Empty:
+        return None
+
+
+# Account a batch that passed a stage
+def account(self, stage, packages, start):
+    statistics = self.stage_statistics[stage]
+    statistics['batches'] += 1
+    statistics['packages'] += packages
+    statistics['busy'] += time.perf_counter() - start
+
+
+# Log the statistics of all stages (if the pipeline is used)
+# The occupancy is the share of time a stage was busy since the statistics were logged the last time
+# Along with it, the fill level of the queue in front of each stage is logged, which shows where batches pile up
+def log_stage_statistics(self, log_function):
+    if not self.stage_statistics:
+        return
+    now = time.monotonic()
+    interval = max(now - self.stage_statistics_start, 1e-9)
+    for stage, statistics in self.stage_statistics.items():
+        # The queue in front of the first stage are the ring buffers
+        if stage in self.stage_queues:
+            fill, size = self.stage_queues[stage].qsize(), self.stage_queues[stage].maxsize
+        else:
+            fill, size = sum(ring.available() for ring in self.input_rings), sum(ring.slots for ring in self.input_rings)
+        log_function('Stage %s (Batches: %d / Packages: %d / Dropped: %d / Occupancy: %.1f%% / Queue: %d/%d)', stage, statistics['batches'], statistics['packages'], statistics['dropped'], statistics['busy'] / interval * 100, fill, size)
+        statistics['busy'] = 0.0
+    self.stage_statistics_start = now
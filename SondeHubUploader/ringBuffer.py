@@ -0,0 +1,63 @@
+# ringBuffer.py - Preallocated ring buffer for received packages
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Ring buffer with a fixed number of slots of a fixed size
+# Packages are received directly into the slots, so no new objects have to be allocated for every received package
+# The ring buffer is meant to be used by exactly one producer (receive thread) and one consumer (processing thread)
+# The producer only ever modifies the write index and the consumer only ever modifies the read index
+# Because of that, no lock is needed
+class RingBuffer:
+
+    # Init function
+    def __init__(self, slots, slot_size):
+        self.slots = slots
+        self.slot_size = slot_size
+        # All slots are stored within a single preallocated bytearray
+        self.buffer = bytearray(slots * slot_size)
+        self.view = memoryview(self.buffer)
+        # The length of the package stored in each slot
+        self.lengths = [0] * slots
+        # The address of the sender of the package stored in each slot
+        self.addresses = [None] * slots
+        # An additional slot that is used for receiving packages that can't be stored (ring buffer full)
+        self.scratch = memoryview(bytearray(slot_size))
+        # Both indices are only ever incremented
+        # The number of packages stored in the ring buffer is the difference between them
+        self.write_index = 0
+        self.read_index = 0
+
+    # Get the number of packages that are stored in the ring buffer
+    def available(self):
+        return self.write_index - self.read_index
+
+    # Get a writable view of a slot, relative to the write index
+    # Returns None if the ring buffer is full
+    def get_write_slot(self, offset):
+        if self.write_index + offset - self.read_index >= self.slots:
+            return None
+        start = ((self.write_index + offset) % self.slots) * self.slot_size
+        return self.view[start:start + self.slot_size]
+
+    # Set the length and the sender address of the package stored in a slot, relative to the write index
+    def set_slot(self, offset, length, address):
+        self.lengths[(self.write_index + offset) % self.slots] = length
+        self.addresses[(self.write_index + offset) % self.slots] = address
+
+    # Hand over the written slots to the consumer
+    def commit(self, count):
+        self.write_index += count
+
+    # Get a read-only view of the package stored in a slot and the address of its sender, relative to the read index
+    # The view is only valid until the slot is released
+    def read_slot(self, offset=0):
+        slot = (self.read_index + offset) % self.slots
+        start = slot * self.slot_size
+        return self.view[start:start + self.lengths[slot]].toreadonly(), self.addresses[slot]
+
+    # Hand the oldest slots back to the producer
+    def release(self, count=1):
+        self.read_index += count
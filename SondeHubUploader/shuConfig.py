@@ -8,10 +8,13 @@
 # Third-party modules
 import logging
 import datetime
+import struct
+import re
 # Own modules
 import SondeHubUploader.conversions as conversions
 import SondeHubUploader.handleData as handleData
 import SondeHubUploader.telemetryChecks as telemetryChecks
+import SondeHubUploader.telemetryRecord as telemetryRecord
 import SondeHubUploader.utils as utils
 
 
@@ -25,8 +28,9 @@ loglevel = {
 }
 
 # URL definitions
-sondehub_telemetry_url = 'https://api.v2.sondehub.org/sondes/telemetry'
-sondehub_station_url = 'https://api.v2.sondehub.org/listeners'
+# Both paths are relative to the base URL of SondeHub (See configuration parameter 'surl')
+sondehub_telemetry_path = '/sondes/telemetry'
+sondehub_station_path = '/listeners'
 
 # Software definitions
 software_name = 'dxlAPRS-SHUE'
@@ -38,14 +42,38 @@ status_code_sondehub_error_1 = 201
 status_code_sondehub_error_2 = 202
 status_code_server_error = 500
 
+# Upload connection pool definitions
+# All uploads within a process share a single pool of connections to SondeHub
+upload_pool_size = 4
+upload_connection_retries = 1
+
+# Aggregator definitions
+# Max. size of a push to the aggregator in bytes
+aggregator_buffersize = 262144
+# Max. number of reformatted telemetry packages within a single push to the aggregator
+aggregator_push_size = 32
+
+# Dedupe index definitions
+# Max. number of entries of the dedupe index
+dedupe_index_size = 4096
+# Time in seconds that a telemetry package is considered a duplicate of an earlier one with the same serial and framenumber
+dedupe_window = 60
+
 # Other definitions
-udp_buffersize = 1024
+udp_batchsize = 64
+sender_formats_size = 256
 thread_sleep = 1
+pipeline_queue_size = 16
 filename_raw_data = 'rawdata'
+filename_quarantine = 'quarantine'
 filename_prefix_telemetry = 't_'
 filename_prefix_reformatted_telemetry = 'r_'
 leap_seconds = 18
 rs41_burst_timer_inactive_value = 65535
+# Telemetry parameters that are never mandatory, as the user callsign is provided instead
+station_optional_parameters = ['source_address']
+# All sites where errors are contained (each one has its own counter)
+failure_sites = ['decode', 'admission', 'plausibility', 'mandatory', 'reformat', 'write_raw_data', 'write_unified_telemetry', 'write_reformatted_telemetry', 'batch', 'worker']
 
 # APRS Parser definitions
 # Fixed position parameter definitions
@@ -161,6 +189,11 @@ parse_aprs_fixed_position = {
         'parse_function':   lambda a: a
     }
 }
+# Fixed position decoder definitions
+# The whole fixed position region of an APRS package (see above) is decoded at once using this struct
+# The pad bytes (x) skip the separators between the parameters
+# The order of the parameters is the same as in 'parse_aprs_fixed_position'
+parse_aprs_fixed_position_struct = struct.Struct('<7s7sBBB9sx2s2s2sB2s5sBx3s5sBx3sx3s3x6sxBBB')
 # Optional parameter definitions
 parse_aprs_optional = {
     'type':
@@ -325,6 +358,28 @@ parse_aprs_optional_multivalue = {
         'subparameter_parse_function':  lambda a: handleData.parse_aprs_rx(a)
     }
 }
+# Prefix table for the optional parameters and the optional multivalue parameters
+# Maps the prefix of every parameter to the parameter itself
+parse_aprs_optional_prefixes = {
+    **{parse_aprs_optional[parameter]['prefix']: parameter for parameter in parse_aprs_optional},
+    **{parse_aprs_optional_multivalue[parameter]['prefix']: parameter for parameter in parse_aprs_optional_multivalue}
+}
+# Optional parameter applicability definitions
+# Some optional (multivalue) parameters are only sent for certain radiosonde types
+# Value: list of radiosonde names (see 'radiosonde') the parameter applies to
+# Parameters that are not listed here apply to all radiosonde types
+parse_aprs_optional_applicability = {
+    'o3':               ['RS41', 'RS92'],
+    'o3_temperature':   ['RS41', 'RS92'],
+    'pump':             ['RS41', 'RS92'],
+    'calibration':      ['RS41', 'RS92'],
+    'powerup':          ['RS41', 'RS92'],
+    'tx_past_burst':    ['RS41']
+}
+# The comment starts right after the altitude (with the DAO, if there is one)
+parse_aprs_comment_start = 69
+# Tokens inside the comment are preceded by a space or an exclamation mark
+parse_aprs_comment_token = re.compile('[ !]([^ !]+)')
 # Optional special parameter definitions
 parse_aprs_optional_special = {
     'frequency':
@@ -369,7 +424,7 @@ telemetry = {
         'json_conversion_function': lambda a, b: handleData.unify_json_type(a, b),
         'aprs_source':              'type',
         'aprs_conversion_function': lambda a: a,
-        'plausibility_function':    lambda a: telemetryChecks.check_type_plausibility(a, radiosonde),
+        'plausibility_function':    lambda a: telemetryChecks.check_type_plausibility(a, radiosonde_index),
         'name':                     'Type',
         'unit':                     None,
         'mandatory':                True,
@@ -1041,3 +1096,12 @@ radiosonde = {
         'enabled':                      True
     }
 }
+# Radiosonde index definitions
+# Maps every radiosonde type and subtype to the name of its radiosonde (see 'utils.create_radiosonde_index')
+radiosonde_index = utils.create_radiosonde_index(radiosonde)
+
+# Telemetry record definitions
+# Unified telemetry is stored in records with the fields of 'telemetry'
+unified_telemetry_record = telemetryRecord.create_record_class('UnifiedTelemetry', telemetry)
+# Reformatted telemetry is stored in records with the fields of 'reformatted_telemetry'
+reformatted_telemetry_record = telemetryRecord.create_record_class('ReformattedTelemetry', reformatted_telemetry)
@@ -3,14 +3,18 @@
 # Copyright (C) Simon Schäfer <simon.gsa@web.de>
 #
 # Released under GNU GPL v3 or later
-import datetime
+
+
+# Own modules
+import SondeHubUploader.caches as caches
+import SondeHubUploader.clock as clock
 
 
 # Check whether unified telemetry is plausible
 def check_plausibility(self, unified_telemetry):
     # Go through all unified telemetry parameters
-    # 'unified_telemetry' is cast to a list, because the values might be modified during the loop
-    for key, value in list(unified_telemetry.items()):
+    # Unified telemetry records allow removing parameters during the loop, so no copy is needed
+    for key, value in unified_telemetry.items():
         # Check all unified telemetry parameters that have a plausibility function assigned to them
         if self.shuConfig.telemetry[key]['plausibility_function'] is not None:
             # Check the unified telemetry parameters using the plausibility function
@@ -26,6 +30,8 @@ def check_plausibility(self, unified_telemetry):
 
 
 # Check whether a callsign is plausible
+# The callsigns are the same for many packages, so the result is cached
+@caches.cached
 def check_callsign_plausibility(callsign):
     # Allowed characters
     capital_letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
@@ -44,21 +50,17 @@ def check_callsign_plausibility(callsign):
 
 
 # Check whether the type is plausible
-def check_type_plausibility(_type, radiosonde):
-    # Go through all possible radiosondes in order to check the type plausibility
-    for name in radiosonde:
-        # The provided type must either match a radiosonde name or subtype
-        if _type == name or (radiosonde[name]['subtype'] is not None and _type in radiosonde[name]['subtype']):
-            return True
-    return False
+def check_type_plausibility(_type, radiosonde_index):
+    # The provided type must either match a radiosonde name or subtype
+    # All of them are contained in the radiosonde index
+    return _type in radiosonde_index
 
 
 # Check whether a date is plausible
 def check_date_plausibility(date, difference_days):
     # The date must be within a certain range around the current UTC date in order to be deemed plausible
-    # Calculate the thresholds
-    lower_threshold = datetime.datetime.utcnow().date() - datetime.timedelta(days=difference_days)
-    upper_threshold = datetime.datetime.utcnow().date() + datetime.timedelta(days=difference_days)
+    # The thresholds are provided by the clock
+    lower_threshold, upper_threshold = clock.date_window(difference_days)
 
     if lower_threshold <= date <= upper_threshold:
         return True
@@ -68,9 +70,8 @@ def check_date_plausibility(date, difference_days):
 # Check whether a time is plausible
 def check_time_plausibility(time, difference_seconds):
     # The time must be within a certain range around the current UTC time in order to be deemed plausible
-    # Calculate the thresholds
-    lower_threshold = (datetime.datetime.utcnow() - datetime.timedelta(seconds=difference_seconds)).time()
-    upper_threshold = (datetime.datetime.utcnow() + datetime.timedelta(seconds=difference_seconds)).time()
+    # The thresholds are provided by the clock
+    lower_threshold, upper_threshold = clock.time_window(difference_seconds)
 
     # Check whether a rollover exists within the range
     if lower_threshold < upper_threshold:
@@ -112,40 +113,30 @@ def check_satellite_levels_plausibility(satellite_levels):
 
 
 # Check whether unified telemetry contains all mandatory parameters for SondeHub
-def check_mandatory(self, unified_telemetry):
-    # The check result is initially 'True' and might be set to 'False' by the checks
-    result = True
-    # At first, all the unified telemetry parameters that are mandatory for all radiosondes are checked
-    # Go through all possible unified telemetry parameters
-    for parameter in self.shuConfig.telemetry:
-        # 'mandatory' is set to true, if the unified telemetry parameter is mandatory for all radiosondes
-        if self.shuConfig.telemetry[parameter]['mandatory'] == True:
-            # Check whether the parameter exists in 'unified_telemetry'
-            if parameter in unified_telemetry:
-                self.loggerObj.debug_detail(f'Mandatory parameter "{parameter}" exists')
-            else:
-                result = False
-                self.loggerObj.error(f'Mandatory parameter "{parameter}" is missing')
-    # The radiosonde type needs to be determined in order to check the mandatory unified telemetry parameters for specific radiosondes
-    _type = None
-    # Go through all possible radiosondes in order to determine the type
-    for name in self.shuConfig.radiosonde:
-        # The radiosonde type/subtype is compared in order to find a match
-        if ('type' in unified_telemetry and unified_telemetry['type'] == name) or\
-                (self.shuConfig.radiosonde[name]['subtype'] is not None and 'type' in unified_telemetry and unified_telemetry['type'] in self.shuConfig.radiosonde[name]['subtype']):
-            _type = name
-    if _type is not None:
-        # Go through all possible unified telemetry parameters (again)
-        for parameter in self.shuConfig.telemetry:
-            # 'mandatory' contains a list of radiosonde types, if the unified telemetry parameter is mandatory for specific radiosondes
-            if type(self.shuConfig.telemetry[parameter]['mandatory']) == list and _type in self.shuConfig.telemetry[parameter]['mandatory']:
-                # Check whether the parameter exists in 'unified_telemetry'
-                if parameter in unified_telemetry:
-                    self.loggerObj.debug_detail(f'Mandatory parameter "{parameter}" exists')
-                else:
-                    result = False
-                    self.loggerObj.error(f'Mandatory parameter "{parameter}" is missing')
-    else:
-        result = False
+# 'radiosonde' is the name of the radiosonde resolved for the unified telemetry (or None if it is unknown)
+def check_mandatory(self, unified_telemetry, radiosonde):
+    # If the radiosonde is known, the unified telemetry parameters that are mandatory for it are checked
+    # Otherwise only the unified telemetry parameters that are mandatory for all radiosondes can be checked
+    mandatory_parameters = self.mandatory_parameters[radiosonde] if radiosonde is not None else self.mandatory_parameters_all
+    # All missing parameters are found using a single set difference
+    missing_parameters = mandatory_parameters.difference(unified_telemetry)
+    if missing_parameters:
+        # The missing parameters are reported in a single line (in the order of the telemetry definitions)
+        self.loggerObj.error('Mandatory parameters missing (%s)', ', '.join(parameter for parameter in self.shuConfig.telemetry if parameter in missing_parameters))
+    if radiosonde is None:
         self.loggerObj.error('Radiosonde type unknown')
-    return result
+        return False
+    return not missing_parameters
+
+
+# Create the sets of mandatory unified telemetry parameters
+# 'mandatory_parameters_all' holds the unified telemetry parameters that are mandatory for all radiosondes
+# 'mandatory_parameters' holds the unified telemetry parameters that are mandatory for each radiosonde (including those that are mandatory for all radiosondes)
+# 'optional_parameters' holds the unified telemetry parameters that are never mandatory for this instance
+def create_mandatory_parameters(self, optional_parameters=()):
+    # 'mandatory' is set to true, if the unified telemetry parameter is mandatory for all radiosondes
+    self.mandatory_parameters_all = frozenset(parameter for parameter in self.shuConfig.telemetry if self.shuConfig.telemetry[parameter]['mandatory'] is True and parameter not in optional_parameters)
+    self.mandatory_parameters = {}
+    for name in self.shuConfig.radiosonde:
+        # 'mandatory' contains a list of radiosonde types, if the unified telemetry parameter is mandatory for specific radiosondes
+        self.mandatory_parameters[name] = self.mandatory_parameters_all.union(parameter for parameter in self.shuConfig.telemetry if type(self.shuConfig.telemetry[parameter]['mandatory']) == list and name in self.shuConfig.telemetry[parameter]['mandatory'] and parameter not in optional_parameters)
@@ -0,0 +1,94 @@
+# telemetryRecord.py - Compact records for storing telemetry
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Marks a field of a record that is not set
+# The marker stays the same object when it is pickled, so the values of records can be passed to other processes
+class Missing:
+    def __reduce__(self):
+        return 'missing'
+
+
+missing = Missing()
+
+
+# Base class of all telemetry records
+# A record stores the values of its fields in a list, in the order of the fields
+# This needs considerably less memory than a dictionary and the field index is shared by all records of the same class
+# Records can be used just like dictionaries, but only the fields of the record class can be set
+# Measured with 'benchmark/telemetryMemory.py', a queued reformatted telemetry package (including its values) needs about 730 bytes
+# Stored in a dictionary, the same package needs about 1140 bytes
+class Record:
+    __slots__ = ('values',)
+    # The fields and the field index are set by the record classes (see 'create_record_class')
+    fields = ()
+    index = {}
+
+    # Init function
+    def __init__(self):
+        self.values = [missing] * len(self.fields)
+
+    # Check whether a field is set
+    def __contains__(self, key):
+        index = self.index.get(key)
+        return index is not None and self.values[index] is not missing
+
+    # Get the value of a field
+    # Raises a KeyError if the field is not set
+    def __getitem__(self, key):
+        value = self.values[self.index[key]]
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    # Set the value of a field
+    # Raises a KeyError if the record class has no such field
+    def __setitem__(self, key, value):
+        self.values[self.index[key]] = value
+
+    # Get the value of a field or a default value if the field is not set
+    def get(self, key, default=None):
+        index = self.index.get(key)
+        if index is None or self.values[index] is missing:
+            return default
+        return self.values[index]
+
+    # Unset a field and return its value
+    def pop(self, key):
+        value = self[key]
+        self.values[self.index[key]] = missing
+        return value
+
+    # Get all fields that are set along with their values (in the order of the fields)
+    # Fields might be unset while iterating over the items
+    def items(self):
+        for field, value in zip(self.fields, self.values):
+            if value is not missing:
+                yield field, value
+
+    # Get all fields that are set
+    def keys(self):
+        return [field for field, value in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.fields) - self.values.count(missing)
+
+    # Convert the record to a dictionary (e.g. for serialising it)
+    def to_dict(self):
+        return dict(self.items())
+
+
+# Create a record class with the provided fields
+def create_record_class(name, fields):
+    fields = tuple(fields)
+    return type(name, (Record,), {
+        '__slots__': (),
+        'fields': fields,
+        'index': {field: index for index, field in enumerate(fields)}
+    })
@@ -7,109 +7,439 @@
 
 # Modules
 import socket
+import select
+import threading
 import queue
-import json
 import time
 
 
 # Receive packages
-def receive(self):
-    # Create a socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((self.addr, self.port))
+def receive(self, listener):
+    # Create a socket for the listener
+    # The socket is closed in any case, so a restarted receive thread is able to bind it again
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(self.listeners[listener])
+        # The statistics and the ring buffer of the listener
+        statistics = self.listener_statistics[listener]
+        ring = self.input_rings[listener]
+
+        # In batched mode, all packages that are ready are received at once
+        if self.recvm == 1:
+            receive_batched(self, sock, statistics, ring)
+            return
+
+        # A timeout allows breaking out of the while-loop when the SondeHubUploader is terminated
+        # Otherwise every listener would have to receive another package before the SondeHubUploader could be closed
+        sock.settimeout(self.shuConfig.thread_sleep)
+
+        while self.running:
+            # Try to receive a package into the ring buffer
+            try:
+                stored = receive_package(self, sock, statistics, ring, 0)
+            except socket.timeout:
+                continue
+            self.loggerObj.debug('Package received')
+            # Hand the package over to the processing thread
+            if stored:
+                ring.commit(1)
+                self.input_event.set()
+                self.loggerObj.debug('Package put in input ring buffer')
+
+
+# Receive packages in batches
+def receive_batched(self, sock, statistics, ring):
+    # The socket is non-blocking, so it can be drained without waiting for further packages
+    sock.setblocking(False)
 
     while self.running:
-        # Try to receive a package
-        data, addr = sock.recvfrom(self.shuConfig.udp_buffersize)
-        self.loggerObj.debug('Package received')
-        # Store the package to the input queue
-        try:
-            self.input_queue.put(data, False)
-            self.loggerObj.debug('Package put in input queue')
-        except queue.Full:
-            self.loggerObj.warning('Input queue full')
+        # Wait until at least one package is ready (or the timeout expired)
+        # The timeout allows breaking out of the while-loop when the SondeHubUploader is terminated
+        readable, _, _ = select.select([sock], [], [], self.shuConfig.thread_sleep)
+        if not readable:
+            continue
+        count = 0
+        # Receive all packages that are ready into consecutive slots of the ring buffer, up to the maximum batch size
+        for i in range(self.shuConfig.udp_batchsize):
+            try:
+                if receive_package(self, sock, statistics, ring, count):
+                    count += 1
+            except BlockingIOError:
+                break
+        self.loggerObj.debug('%d packages received', count)
+        # Hand the entire batch over to the processing thread at once
+        if count > 0:
+            ring.commit(count)
+            self.input_event.set()
+            self.loggerObj.debug('%d packages put in input ring buffer', count)
+
+
+# Receive a single package into a slot of the ring buffer, relative to the write index
+# Returns True if the package was stored in the ring buffer
+def receive_package(self, sock, statistics, ring, offset):
+    slot = ring.get_write_slot(offset)
+    # If the ring buffer is full, the package is still received (into the scratch slot), but it is dropped
+    # 'MSG_TRUNC' causes the actual length of the package to be returned, even if it exceeds the slot size
+    length, addr = sock.recvfrom_into(slot if slot is not None else ring.scratch, ring.slot_size, socket.MSG_TRUNC)
+    statistics['received'] += 1
+    # Packages that exceed the slot size are truncated and therefore dropped
+    if length > ring.slot_size:
+        statistics['overruns'] += 1
+        self.loggerObj.warning('Package exceeds slot size (%d bytes)', length)
+        return False
+    if slot is None:
+        statistics['dropped'] += 1
+        self.loggerObj.warning('Input ring buffer full')
+        return False
+    ring.set_slot(offset, length, addr)
+    return True
 
 
 # Process packages
 def process_input_queue(self):
     while self.running:
-        # Get package, if there are any in the input queue
-        package = self.input_queue.get()
-        self.loggerObj.debug('Package taken from input queue')
-        # Optionally write the raw data
-        if self.writeo:
-            self.writeData.write_raw_data(self, package)
-        # Mode is set to JSON or package was determined to be JSON
-        if (self.mode == 0 or self.mode == 1) and self.utils.check_json(package):
-            # Package is valid JSON
-            valid = True
-            self.loggerObj.debug('Package is JSON')
-            # Parse the JSON package
-            json_telemetry = json.loads(package.decode())
-            self.loggerObj.debug('JSON package parsed (Serial: %s)', json_telemetry['id'] if 'id' in json_telemetry else 'N/A')
-            # Unify the JSON package
-            unified_telemetry = self.handleData.unify_json(self, json_telemetry)
-            self.loggerObj.debug('JSON package unified (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
-        # Mode is set to APRS or package was determined to be APRS
-        elif (self.mode == 0 or self.mode == 2) and self.crc_calculator.verify(package[:-2], package[-1] << 8 | package[-2]):
-            # Package is valid APRS
-            valid = True
-            self.loggerObj.debug('Package is APRS')
-            # Parse the APRS package
-            aprs_telemetry = self.handleData.parse_aprs(self, package[:-2])
-            self.loggerObj.debug('APRS package parsed (Serial: %s)', aprs_telemetry['serial'] if 'serial' in aprs_telemetry else 'N/A')
-            # Unify the APRS package
-            unified_telemetry = self.handleData.unify_aprs(self, aprs_telemetry)
-            self.loggerObj.debug('APRS package unified (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
-        # Mode is incorrectly selected or data is invalid
+        # Collect a batch of packages from the ring buffers
+        # The packages stay in their slots until the entire batch is processed
+        packages, taken = collect_batch(self)
+        if len(packages) > 0:
+            self.loggerObj.debug('%d packages taken from input ring buffers', len(packages))
+            # All packages of a batch are processed with the same current time
+            self.clock.tick()
+            try:
+                put_upload_batch(self, process_batch(self, packages))
+            # The slots are released right after processing, so the receive threads can reuse them
+            # This is also done if processing failed, so a restarted processing thread doesn't process the same batch again
+            finally:
+                for ring, count in zip(self.input_rings, taken):
+                    ring.release(count)
         else:
-            valid = False
-            if self.mode == 0:
-                self.loggerObj.error('Package is neither valid JSON nor valid APRS')
-            elif self.mode == 1:
-                self.loggerObj.error('Package is not valid JSON')
-            elif self.mode == 2:
-                self.loggerObj.error('Package is not valid APRS')
-        if valid:
-            self.loggerObj.info('Telemetry received (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
-            # Check whether the telemetry is plausible
-            unified_telemetry = self.telemetryChecks.check_plausibility(self, unified_telemetry)
-            self.loggerObj.debug('Plausibility checks performed (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
-            # Optionally write the telemetry
-            if self.writet:
-                if 'serial' in unified_telemetry:
-                    self.writeData.write_unified_telemetry(self, unified_telemetry)
-                else:
-                    self.loggerObj.error('Could not write telemetry (serial missing)')
-            # Check whether the mandatory telemetry for SondeHub is included
-            if self.telemetryChecks.check_mandatory(self, unified_telemetry):
-                self.loggerObj.debug('Mandatory data check successful (Serial: %s)', unified_telemetry['serial'])
-                # Reformat the telemetry to the SondeHub telemetry format
-                reformatted_telemetry = self.handleData.reformat_telemetry(self, unified_telemetry)
-                self.loggerObj.debug('Telemetry reformatted (Serial: %s)', reformatted_telemetry['serial'])
-                # Optionally write the reformatted telemetry
-                if self.writer:
-                    self.writeData.write_reformatted_telemetry(self, reformatted_telemetry)
-                # Go through all possible radiosonde types
-                for name in self.shuConfig.radiosonde:
-                    # The radiosonde type/subtype is compared in order to find a match
-                    if unified_telemetry['type'] == name or\
-                            (self.shuConfig.radiosonde[name]['subtype'] is not None and unified_telemetry['type'] in self.shuConfig.radiosonde[name]['subtype']):
-                        # Check whether uploading for this radiosonde is enabled
-                        if self.shuConfig.radiosonde[name]['enabled']:
-                            self.loggerObj.debug('Uploading for radiosonde type %s is enabled', name)
-                            # Store the reformatted telemetry to the upload queue
-                            try:
-                                self.upload_queue.put(reformatted_telemetry, False)
-                                self.loggerObj.debug('Reformatted telemetry put in queue (Serial: %s)', reformatted_telemetry['serial'])
-                            except queue.Full:
-                                self.loggerObj.warning('Upload queue full')
-                        else:
-                            self.loggerObj.warning('Uploading for radiosonde type %s is disabled', name)
-                        # Break out of for-loop after the first match because only a single match is expected
-                        break
-            else:
-                self.loggerObj.error('Mandatory data check failed (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+            # Wait until a receive thread hands over new packages (or the timeout expired)
+            self.input_event.wait(self.shuConfig.thread_sleep)
+
+
+# Hand packages over to the worker processes
+# This is used instead of processing the packages, if worker processes are used
+def dispatch_input_queue(self):
+    while self.running:
+        packages, taken = collect_batch(self)
+        if len(packages) > 0:
+            self.loggerObj.debug('%d packages taken from input ring buffers', len(packages))
+            # The packages are copied out of their slots, so they can be passed to the worker processes
+            try:
+                self.workerProcesses.dispatch(self, [(bytes(package), address) for package, address in packages])
+            finally:
+                for ring, count in zip(self.input_rings, taken):
+                    ring.release(count)
+        else:
+            # Wait until a receive thread hands over new packages (or the timeout expired)
+            self.input_event.wait(self.shuConfig.thread_sleep)
+
+
+# Collect the reformatted telemetry processed by the worker processes
+# All worker processes share the upload of the SondeHubUploader
+def collect_worker_results(self):
+    while self.running:
+        # A timeout allows breaking out of the while-loop when the SondeHubUploader is terminated
+        try:
+            kind, content = self.worker_result_queue.get(True, self.shuConfig.thread_sleep)
+        except queue.Empty:
+            continue
+        # The result queue holds reformatted telemetry as well as the statistics of worker processes that stopped
+        if kind == 'results':
+            put_upload_batch(self, self.workerProcesses.rebuild_results(self, content))
+        else:
+            self.workerProcesses.add_worker_statistics(self, content)
+
+
+# Collect a batch of packages from the ring buffers
+# A batch is complete when it holds the max. number of packages or when the deadline after its first package expired
+# Returns the packages (along with the address of their sender) and the number of packages taken from each ring buffer
+def collect_batch(self):
+    packages = []
+    taken = [0] * len(self.input_rings)
+    deadline = None
+    while True:
+        # The event is cleared before the ring buffers are checked, so no package that is put in afterwards can be missed
+        self.input_event.clear()
+        # Go through the ring buffers of all listeners
+        for listener, ring in enumerate(self.input_rings):
+            # Take all packages that are currently stored in the ring buffer (as long as the batch is not full)
+            count = min(ring.available() - taken[listener], self.pbatch - len(packages))
+            for i in range(count):
+                # The package is processed directly within its slot
+                packages.append(ring.read_slot(taken[listener] + i))
+            taken[listener] += count
+        # Stop collecting if the batch is full or if there are no packages at all
+        if len(packages) >= self.pbatch or len(packages) == 0:
+            return packages, taken
+        # The deadline starts with the first package of the batch
+        if deadline is None:
+            deadline = time.monotonic() + self.pdead / 1000
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return packages, taken
+        # Wait until a receive thread hands over further packages (or the deadline expired)
+        self.input_event.wait(remaining)
+
+
+# Process a batch of packages
+# Every processing step is performed for all packages of the batch, before the next step is performed
+# Errors are contained for every single package, so one faulty package can't stall the processing of all others
+# Returns the reformatted telemetry that is to be uploaded
+def process_batch(self, packages):
+    frames = decode_batch(self, packages)
+    frames, reformatted_telemetry_batch = validate_batch(self, frames)
+    persist_batch(self, [package for package, address in packages], [unified_telemetry for package, unified_telemetry, radiosonde in frames], reformatted_telemetry_batch)
+    # Telemetry of radiosondes that are not enabled for upload was already rejected by the admission filter
+    return reformatted_telemetry_batch
+
+
+# Decode a batch of packages (JSON or APRS, depending on the mode) and check whether they are admitted
+# Each package is kept along with its unified telemetry and its radiosonde, so it can still be quarantined later on
+# Returns the frames (package, unified telemetry and radiosonde) of all admitted packages
+def decode_batch(self, packages):
+    frames = []
+    for (package, address), crc_valid in zip(packages, verify_crc_batch(self, packages)):
+        try:
+            unified_telemetry = decode_package(self, package, address, crc_valid)
+        except Exception:
+            contain_failure(self, 'decode', package)
+            continue
+        if unified_telemetry is None:
+            continue
+        self.loggerObj.info('Telemetry received (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+        try:
+            # The radiosonde is resolved only once and then used by all following steps
+            radiosonde = self.utils.resolve_radiosonde(self, unified_telemetry)
+            # Check whether the telemetry is admitted to the further processing
+            # The following steps are only performed for telemetry that is kept
+            reason = self.admission.check_admission(self, unified_telemetry, radiosonde)
+        except Exception:
+            contain_failure(self, 'admission', package)
+            continue
+        if reason is not None:
+            self.admission_statistics[reason] += 1
+            self.loggerObj.debug('Telemetry rejected (Reason: %s, Serial: %s)', reason, unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+            continue
+        frames.append((package, unified_telemetry, radiosonde))
+    return frames
+
+
+# Check a batch of frames and reformat their telemetry
+# Returns the frames that passed the plausibility checks and the reformatted telemetry of all complete frames
+def validate_batch(self, frames):
+    # Check whether the telemetry is plausible
+    plausible_frames = []
+    for package, unified_telemetry, radiosonde in frames:
+        try:
+            plausible_frames.append((package, self.telemetryChecks.check_plausibility(self, unified_telemetry), radiosonde))
+        except Exception:
+            contain_failure(self, 'plausibility', package)
+    self.loggerObj.debug('Plausibility checks performed (%d packages)', len(plausible_frames))
+    reformatted_telemetry_batch = []
+    for package, unified_telemetry, radiosonde in plausible_frames:
+        # Check whether the mandatory telemetry for SondeHub is included
+        try:
+            complete = self.telemetryChecks.check_mandatory(self, unified_telemetry, radiosonde)
+        except Exception:
+            contain_failure(self, 'mandatory', package)
+            continue
+        if complete:
+            self.loggerObj.debug('Mandatory data check successful (Serial: %s)', unified_telemetry['serial'])
+            # Reformat the telemetry to the SondeHub telemetry format
+            try:
+                reformatted_telemetry = self.handleData.reformat_telemetry(self, unified_telemetry, radiosonde)
+            except Exception:
+                contain_failure(self, 'reformat', package)
+                continue
+            self.loggerObj.debug('Telemetry reformatted (Serial: %s)', reformatted_telemetry['serial'])
+            reformatted_telemetry_batch.append(reformatted_telemetry)
+        else:
+            self.loggerObj.error('Mandatory data check failed (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+    return plausible_frames, reformatted_telemetry_batch
+
+
+# Optionally write the raw data, the telemetry and the reformatted telemetry of a batch
+# Errors while writing are contained for the entire batch
+def persist_batch(self, raw_data_batch, unified_telemetry_batch, reformatted_telemetry_batch):
+    # Optionally write the raw data
+    if self.writeo:
+        try:
+            self.writeData.write_raw_data(self, raw_data_batch)
+        except Exception:
+            contain_failure(self, 'write_raw_data', None)
+    # Optionally write the telemetry
+    if self.writet:
+        for unified_telemetry in unified_telemetry_batch:
+            if 'serial' not in unified_telemetry:
+                self.loggerObj.error('Could not write telemetry (serial missing)')
+        try:
+            self.writeData.write_unified_telemetry(self, [unified_telemetry for unified_telemetry in unified_telemetry_batch if 'serial' in unified_telemetry])
+        except Exception:
+            contain_failure(self, 'write_unified_telemetry', None)
+    # Optionally write the reformatted telemetry
+    if self.writer:
+        try:
+            self.writeData.write_reformatted_telemetry(self, reformatted_telemetry_batch)
+        except Exception:
+            contain_failure(self, 'write_reformatted_telemetry', None)
+
+
+# Contain an error that occurred while processing
+# The error is logged (including the traceback) and counted for the site where it occurred
+# The package that caused the error (if there is a single one) is written to the quarantine file
+# This function must only be called from within an exception handler
+def contain_failure(self, site, package):
+    self.failure_statistics[site] += 1
+    self.loggerObj.exception('Error processing package (%s)', site)
+    if package is not None:
+        self.writeData.write_quarantine(self, site, package)
+
+
+# Store a batch of reformatted telemetry to the upload queue
+# The upload lock is taken only once for the entire batch
+# It protects the dedupe index and keeps the packages of a batch together, if multiple threads store batches
+# Duplicates are suppressed (See 'dedupe_key') and packages are dropped if the upload queue is full
+def put_upload_batch(self, upload_batch):
+    if len(upload_batch) == 0:
+        return
+    now = time.monotonic()
+    queued = 0
+    duplicates = 0
+    dropped = 0
+    with self.upload_lock:
+        for package in upload_batch:
+            # Duplicates are dropped before they take up space in the upload queue
+            key = dedupe_key(package)
+            if key is not None and self.dedupe_index.contains(key, now):
+                duplicates += 1
+                continue
+            try:
+                self.upload_queue.put_nowait(package)
+            except queue.Full:
+                dropped += 1
+                continue
+            # The package is only marked as seen once it is in the upload queue
+            # Otherwise, another copy of a dropped package would be suppressed as well
+            if key is not None:
+                self.dedupe_index.add(key, now)
+            queued += 1
+        self.upload_statistics['queued'] += queued
+        self.upload_statistics['duplicates'] += duplicates
+        self.upload_statistics['dropped'] += dropped
+    self.loggerObj.debug('%d reformatted telemetry packages put in upload queue', queued)
+    if duplicates > 0:
+        self.loggerObj.debug('%d duplicate telemetry packages suppressed', duplicates)
+    if dropped > 0:
+        self.loggerObj.warning('Upload queue full (%d packages dropped)', dropped)
+
+
+# Get the key that identifies a reformatted telemetry package in the dedupe index
+# Duplicates occur if the same frame of a radiosonde is received multiple times (e.g. by two decoders or from other instances by the aggregator)
+# Packages are identified by the serial and the framenumber of their radiosonde
+# Returns None if the package has no framenumber, so it can not be deduplicated
+def dedupe_key(package):
+    if 'frame' not in package:
+        return None
+    return package['serial'], package['frame']
+
+
+# Verify the CRC of all packages of a batch that might be APRS at once
+# Returns the result for every package (None if the package was not verified, as it is JSON)
+def verify_crc_batch(self, packages):
+    results = [None] * len(packages)
+    # Mode is set to JSON
+    if self.mode == 1:
+        return results
+    # In auto-select mode, packages that are obviously JSON are skipped
+    candidates = [index for index, (package, address) in enumerate(packages) if self.mode == 2 or self.utils.sniff_format(package) != 'JSON']
+    for index, crc_valid in zip(candidates, self.crc_calculator.verify_batch([packages[index][0] for index in candidates])):
+        results[index] = crc_valid
+    return results
+
+
+# Decode a package
+# The result of the CRC verification is passed in, if it was already verified along with the entire batch
+# Returns the unified telemetry or None if the package could not be decoded
+def decode_package(self, package, address, crc_valid=None):
+    # Mode is set to JSON
+    if self.mode == 1:
+        unified_telemetry = decode_json(self, package)
+        if unified_telemetry is None:
+            self.loggerObj.error('Package is not valid JSON')
+        return unified_telemetry
+    # Mode is set to APRS
+    elif self.mode == 2:
+        unified_telemetry = decode_aprs(self, package, crc_valid)
+        if unified_telemetry is None:
+            self.loggerObj.error('Package is not valid APRS')
+        return unified_telemetry
+    # Mode is set to auto-select
+    # The format that was previously determined for the sender of the package is tried first (if it is known)
+    known_format = self.sender_formats.get(address)
+    if known_format is not None:
+        unified_telemetry = decode_format(self, package, known_format, crc_valid)
+        if unified_telemetry is not None:
+            return unified_telemetry
+    # Otherwise the format is determined by a quick look at the package
+    # Only if that is not possible, both formats are tried
+    sniffed_format = self.utils.sniff_format(package)
+    for _format in [sniffed_format] if sniffed_format is not None else ['JSON', 'APRS']:
+        # There is no need to try the previously determined format again
+        if _format != known_format:
+            unified_telemetry = decode_format(self, package, _format, crc_valid)
+            if unified_telemetry is not None:
+                # Remember the format for the sender of the package
+                self.utils.remember_sender_format(self, address, _format)
+                return unified_telemetry
+    self.loggerObj.error('Package is neither valid JSON nor valid APRS')
+    return None
+
+
+# Decode a package of a certain format
+def decode_format(self, package, _format, crc_valid=None):
+    if _format == 'JSON':
+        return decode_json(self, package)
+    return decode_aprs(self, package, crc_valid)
+
+
+# Decode a JSON package
+# Returns the unified telemetry or None if the package is not valid JSON
+def decode_json(self, package):
+    # Parse the JSON package
+    # This is done only once, directly on the received package
+    # Checking whether JSON data is valid is relatively easy by just trying to parse it
+    try:
+        json_telemetry = self.jsonCodec.loads(package)
+    except ValueError:
+        return None
+    # The JSON telemetry must be a JSON object
+    if type(json_telemetry) != dict:
+        return None
+    self.loggerObj.debug('Package is JSON')
+    self.loggerObj.debug('JSON package parsed (Serial: %s)', json_telemetry['id'] if 'id' in json_telemetry else 'N/A')
+    # Unify the JSON package
+    unified_telemetry = self.handleData.unify_json(self, json_telemetry)
+    self.loggerObj.debug('JSON package unified (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+    return unified_telemetry
+
+
+# Decode an APRS package
+# Returns the unified telemetry or None if the package is not valid APRS
+def decode_aprs(self, package, crc_valid=None):
+    # The CRC is verified directly on the view of the package (if it was not verified along with the batch already)
+    if crc_valid is None:
+        crc_valid = self.crc_calculator.verify_frame(package)
+    if not crc_valid:
+        return None
+    self.loggerObj.debug('Package is APRS')
+    # Parse the APRS package
+    # The parse functions need a bytes object, so the package is copied after it has been verified
+    aprs_telemetry = self.handleData.parse_aprs(self, bytes(package[:-2]))
+    self.loggerObj.debug('APRS package parsed (Serial: %s)', aprs_telemetry['serial'] if 'serial' in aprs_telemetry else 'N/A')
+    # Unify the APRS package
+    unified_telemetry = self.handleData.unify_aprs(self, aprs_telemetry)
+    self.loggerObj.debug('APRS package unified (Serial: %s)', unified_telemetry['serial'] if 'serial' in unified_telemetry else 'N/A')
+    return unified_telemetry
 
 
 # Upload the reformatted telemetry packages
@@ -117,23 +447,42 @@ def process_upload_queue(self):
     while self.running:
         # Check whether it is time for uploading, based on the configured update rate and the last upload time
         if (time.time() - self.last_telemetry_upload) > self.telemu:
-            self.loggerObj.debug('Telemetry upload')
-            # Create an empty list that will hold the reformatted telemetry packages
-            to_upload = []
-            # Get all packages that are currently stored in the upload queue and append them to the previously created list
-            while not self.upload_queue.empty():
-                to_upload.append(self.upload_queue.get(False))
-            # Upload the packages (if there are any)
-            if len(to_upload) > 0:
-                self.uploader.upload_telemetry(self, to_upload)
-            else:
-                self.loggerObj.debug('No telemetry for uploading')
+            upload_queued_telemetry(self)
             # Save the upload time in order to determine when it is time for the next upload
             self.last_telemetry_upload = time.time()
         # This task is performed every second
         time.sleep(self.shuConfig.thread_sleep)
 
 
+# Upload all reformatted telemetry packages that are currently stored in the upload queue
+def upload_queued_telemetry(self):
+    self.loggerObj.debug('Telemetry upload')
+    # The statistics of all listeners and caches are logged along with every telemetry upload
+    self.utils.log_listener_statistics(self, self.loggerObj.debug)
+    self.admission.log_admission_statistics(self, self.loggerObj.debug)
+    self.utils.log_failure_statistics(self, self.loggerObj.debug)
+    self.pipeline.log_stage_statistics(self, self.loggerObj.debug)
+    self.workerProcesses.log_worker_statistics(self, self.loggerObj.debug)
+    self.aggregator.log_aggregator_statistics(self, self.loggerObj.debug)
+    self.utils.log_upload_statistics(self, self.loggerObj.debug)
+    self.caches.log_cache_statistics(self.loggerObj.debug)
+    # Create an empty list that will hold the reformatted telemetry packages
+    to_upload = []
+    # Get all packages that are currently stored in the upload queue and append them to the previously created list
+    while not self.upload_queue.empty():
+        to_upload.append(self.upload_queue.get(False))
+    if len(to_upload) == 0:
+        self.loggerObj.debug('No telemetry for uploading')
+        return
+    # If there is an aggregator, the packages are pushed to it instead of uploading them
+    # Packages that could not be pushed are uploaded directly, so they don't get lost
+    if self.aggs is not None and self.aggm == 0:
+        to_upload = self.aggregator.push_telemetry(self, to_upload)
+    # Upload the packages (if there are any left)
+    if len(to_upload) > 0:
+        self.uploader.upload_telemetry(self, to_upload)
+
+
 # Upload the station
 def upload_station(self):
     while self.running:
@@ -145,3 +494,40 @@ def upload_station(self):
             self.last_station_upload = time.time()
         # This task is performed every second   
         time.sleep(self.shuConfig.thread_sleep)
+
+
+# Start a worker thread
+# Target and arguments are stored along with the thread, so the supervisor is able to restart it
+def start_worker(self, name, target, args):
+    thread = threading.Thread(target=run_worker, args=(self, name, target, args), name=name)
+    self.workers[name] = (thread, target, args)
+    thread.start()
+    self.loggerObj.debug('%s thread started', name)
+
+
+# Run the target of a worker thread
+# An uncaught exception still ends the worker thread, but it is logged and counted first
+def run_worker(self, name, target, args):
+    try:
+        target(*args)
+    except Exception:
+        self.failure_statistics['worker'] += 1
+        self.loggerObj.exception('%s thread died', name)
+
+
+# Supervise all worker threads
+def supervise(self):
+    while self.running:
+        # Restart all worker threads that died (as long as the SondeHubUploader is not terminated)
+        for name, (thread, target, args) in list(self.workers.items()):
+            if not thread.is_alive() and self.running:
+                self.loggerObj.warning('Restarting %s thread', name)
+                start_worker(self, name, target, args)
+        # Worker processes that died are restarted as well
+        for index in range(self.procs):
+            if not self.worker_processes[index].is_alive() and self.running:
+                self.failure_statistics['worker'] += 1
+                self.loggerObj.warning('Restarting worker process %d', index)
+                self.workerProcesses.start_worker_process(self, index)
+        # This task is performed every second
+        time.sleep(self.shuConfig.thread_sleep)
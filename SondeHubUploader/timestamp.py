@@ -0,0 +1,54 @@
+# timestamp.py - Functions for handling timestamps
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import datetime
+# Own modules
+import SondeHubUploader.caches as caches
+
+
+# Start of the GPS time scale (01/06/1980)
+# All timestamps are handled as whole seconds since then, along with their microseconds
+gps_epoch = datetime.datetime(1980, 1, 6, 0, 0, 0)
+gps_epoch_ordinal = gps_epoch.toordinal()
+
+
+# Calculate the seconds since 01/06/1980 of a datetime (GPS seconds)
+# The seconds are calculated directly from the components of the datetime, the microseconds are dropped
+def gps_seconds(_datetime):
+    return (_datetime.toordinal() - gps_epoch_ordinal) * 86400 + _datetime.hour * 3600 + _datetime.minute * 60 + _datetime.second
+
+
+# Add an offset (e.g. leap seconds) to a timestamp given as GPS seconds and microseconds
+def add_seconds(seconds, microsecond, offset):
+    # Leap seconds are whole seconds, so usually only the seconds need to be changed
+    if type(offset) is int:
+        return seconds + offset, microsecond
+    # Other offsets are rounded to full microseconds (just like a timedelta would do it)
+    seconds, microsecond = divmod(seconds * 1000000 + microsecond + round(offset * 1000000), 1000000)
+    return seconds, microsecond
+
+
+# Generate the ISO 8601 string of a timestamp given as GPS seconds and microseconds
+# The string has the format that SondeHub expects (e.g. '2023-05-01T12:34:56.000000Z')
+def format_iso(seconds, microsecond):
+    # Most timestamps do not have any microseconds, so the suffix is a constant in that case
+    if microsecond == 0:
+        return format_iso_prefix(seconds) + '.000000Z'
+    return format_iso_prefix(seconds) + '.{:06d}Z'.format(microsecond)
+
+
+# Generate the ISO 8601 string of a datetime
+def format_datetime(_datetime):
+    return format_iso(gps_seconds(_datetime), _datetime.microsecond)
+
+
+# Generate the date and time part of the ISO 8601 string of a timestamp given as GPS seconds
+# Many packages are received within the same second, so the result is cached
+@caches.cached
+def format_iso_prefix(seconds):
+    return (gps_epoch + datetime.timedelta(seconds=seconds)).strftime('%Y-%m-%dT%H:%M:%S')
@@ -6,12 +6,31 @@
 
 
 import time
+import threading
 import requests
-import json
 import gzip
 import email.utils
 
 
+# All uploads share a single session, so connections to SondeHub are kept alive and reused
+# The session is shared by all instances within a process
+session = None
+session_lock = threading.Lock()
+
+
+# Create the shared session (if not already done)
+def create_session(self):
+    global session
+    with session_lock:
+        if session is None:
+            session = requests.Session()
+            # Connections that were closed by SondeHub while idle are reestablished, instead of failing the upload
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.shuConfig.upload_pool_size, max_retries=self.shuConfig.upload_connection_retries)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+    return session
+
+
 # Upload station to SondeHub
 def upload_station(self):
     # Create a dictionary that holds all the station data
@@ -38,9 +57,9 @@ def upload_station(self):
                 'Content-Type': 'application/json',
                 'Date': email.utils.formatdate(timeval=None, localtime=False, usegmt=True)
             }
-            req = requests.put(
-                self.shuConfig.sondehub_station_url,
-                json=position,
+            req = self.session.put(
+                self.sondehub_station_url,
+                self.jsonCodec.dumps(position),
                 timeout=self.timeout,
                 headers=headers
             )
@@ -72,7 +91,7 @@ def upload_telemetry(self, telemetry):
     # Compress the telemetry
     try:
         start_time = time.time()
-        json_telemetry = json.dumps(telemetry).encode('utf-8')
+        json_telemetry = self.jsonCodec.dumps(telemetry)
         compressed_payload = gzip.compress(json_telemetry)
     except Exception:
         self.loggerObj.error('Error serialising and compressing telemetry list')
@@ -93,8 +112,8 @@ def upload_telemetry(self, telemetry):
                 'Content-Type': 'application/json',
                 'Date': email.utils.formatdate(timeval=None, localtime=False, usegmt=True)
             }
-            req = requests.put(
-                self.shuConfig.sondehub_telemetry_url,
+            req = self.session.put(
+                self.sondehub_telemetry_url,
                 compressed_payload,
                 timeout=self.timeout,
                 headers=headers
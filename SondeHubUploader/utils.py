@@ -5,41 +5,130 @@
 # Released under GNU GPL v3 or later
 
 
-import json
 import datetime
 import hashlib
+# Own modules
+import SondeHubUploader.caches as caches
+import SondeHubUploader.clock as clock
 
 
-# Disable upload for all radiosondes that were not enabled
-def disable_radiosondes(self, enabled_radiosondes):
-    # Go through all possible radiosonde types
-    for name in self.shuConfig.radiosonde:
-        # Check whether the name of the radiosonde is within the list of enabled radiosondes
-        if name not in enabled_radiosondes.split(','):
-            # Disable uploading for a radiosonde that is not within the list of enabled radiosondes
-            self.shuConfig.radiosonde[name]['enabled'] = False
-    return False
+# Prepare everything that is needed for processing packages
+# This is done by the SondeHubUploader as well as by every worker process
+def prepare_processing(self):
+    # Create a crc calculator
+    self.crc.crc_create_calculator(self, 0x1021, 0xFFFF, 0xFFFF)
 
+    # Create the sets of mandatory telemetry parameters for all radiosondes
+    # The source address is not mandatory, as a user callsign is always provided
+    self.telemetryChecks.create_mandatory_parameters(self, self.shuConfig.station_optional_parameters)
 
-# Check whether data is valid JSON data
-def check_json(data):
-    # Checking whether JSON data is valid is relatively easy by just trying to decode it
-    try:
-        json.loads(data.decode())
-    except ValueError:
-        return False
-    return True
+    # Number of errors that were contained for each site
+    self.failure_statistics = dict.fromkeys(self.shuConfig.failure_sites, 0)
 
+    # Stores the format (JSON or APRS) that was determined for each sender in auto-select mode
+    self.sender_formats = {}
 
-# Search for a key inside an aprs package string
-def aprs_package_string_find_key(aprs_string, key):
-    # There might be a space or an exclamation mark before the key
-    for prefix in [' ', '!']:
-        index = aprs_string.find(prefix + key)
-        # Calculate the first index of the value
-        if index != -1:
-            return index + len(key) + 1
-    return -1
+    # The uploader position included in every reformatted telemetry package
+    # It is the same for all packages, so it is only rounded once
+    self.uploader_position = [round(self.pos[0], 5), round(self.pos[1], 5), round(self.pos[2], 1)]
+
+    # The radiosondes that are enabled for upload
+    self.enabled_radiosondes = create_enabled_radiosondes(self, self.sonde)
+
+    # Create the parse profiles for all radiosonde types (including their APRS unification plans)
+    # Parse profiles and unification plans are compiled once and shared by all instances within a process
+    self.handleData.create_parse_profiles(self)
+    # Create the JSON unification plan
+    self.handleData.create_unification_plan_json(self)
+    # Create the admission filter
+    self.admission.create_admission_filter(self)
+
+
+# Create the set of radiosondes that are enabled for upload
+# The radiosonde table itself is never changed, so multiple instances with different radiosondes enabled can coexist within a process
+def create_enabled_radiosondes(self, enabled_radiosondes):
+    # A radiosonde must be enabled in the radiosonde table as well as within the list of enabled radiosondes
+    return frozenset(name for name in self.shuConfig.radiosonde if self.shuConfig.radiosonde[name]['enabled'] and name in enabled_radiosondes.split(','))
+
+
+# Create an index that maps every radiosonde type and subtype to the name of its radiosonde
+# This replaces searching the radiosonde table for a matching type or subtype
+def create_radiosonde_index(radiosonde):
+    radiosonde_index = {}
+    # Go through all possible radiosondes
+    for name in radiosonde:
+        # If a type matches multiple radiosondes, the first match is used
+        radiosonde_index.setdefault(name, name)
+        if radiosonde[name]['subtype'] is not None:
+            for subtype in radiosonde[name]['subtype']:
+                radiosonde_index.setdefault(subtype, name)
+    return radiosonde_index
+
+
+# Resolve the name of the radiosonde of unified telemetry using the radiosonde index
+# Returns None if the type is missing or unknown
+def resolve_radiosonde(self, unified_telemetry):
+    if 'type' in unified_telemetry:
+        return self.shuConfig.radiosonde_index.get(unified_telemetry['type'])
+    return None
+
+
+# Log the statistics of all listeners using the provided logging function
+def log_listener_statistics(self, log_function):
+    for listener in range(len(self.listeners)):
+        log_function('Listener %s:%d (Received: %d / Dropped: %d / Overruns: %d)', *self.listeners[listener], self.listener_statistics[listener]['received'], self.listener_statistics[listener]['dropped'], self.listener_statistics[listener]['overruns'])
+
+
+# Log the statistics of the upload queue using the provided logging function
+def log_upload_statistics(self, log_function):
+    log_function('Upload queue (Queued: %d / Duplicates: %d / Dropped: %d / Dedupe index: %d/%d)', self.upload_statistics['queued'], self.upload_statistics['duplicates'], self.upload_statistics['dropped'], len(self.dedupe_index), self.dedupe_index.size)
+
+
+# Log the number of errors that were contained for each site
+def log_failure_statistics(self, log_function):
+    log_function('Failures (%s)', ' / '.join(f'{site}: {count}' for site, count in self.failure_statistics.items()))
+
+
+# Extract the serial of a radiosonde from a package, without decoding it
+# This is only used for routing packages to the worker processes, so it is done as cheaply as possible
+# Returns the serial as bytes or None if it can't be extracted
+def extract_serial(package):
+    # For JSON packages, the serial is the value of the key 'id'
+    if len(package) > 0 and package[0] == ord('{'):
+        start = package.find(b'"id"')
+        if start == -1:
+            return None
+        start = package.find(b'"', start + 4)
+        end = package.find(b'"', start + 1)
+        return package[start + 1:end] if start != -1 and end != -1 else None
+    # For APRS packages, the serial is the name of the object, which directly follows the addresses and the data type
+    if len(package) > 26 and package[16] == ord(';'):
+        return package[17:26]
+    return None
+
+
+# Determine the format of a package by a quick look at its first byte and structure, without decoding it
+# Returns 'JSON', 'APRS' or None if the format can't be determined
+def sniff_format(package):
+    # JSON packages sent by sondemod are JSON objects, so they start with an opening curly bracket
+    # The first byte of an APRS package is part of the destination address, which is shifted left by one bit
+    # Because of that, the first byte of an APRS package is always even, while the opening curly bracket is odd
+    if len(package) > 0 and package[0] == ord('{'):
+        return 'JSON'
+    # APRS packages are AX.25 UI frames with the control field 0x03 and the protocol id 0xF0 following the addresses
+    # They must also contain at least the data type and the CRC
+    if len(package) > 18 and package[14] == 0x03 and package[15] == 0xF0:
+        return 'APRS'
+    return None
+
+
+# Remember the format of the packages sent by a certain sender
+def remember_sender_format(self, address, _format):
+    # The number of remembered senders is limited
+    # This might only become relevant if senders are constantly changing their ports (e.g. restarted very often)
+    if address not in self.sender_formats and len(self.sender_formats) >= self.shuConfig.sender_formats_size:
+        self.sender_formats.clear()
+    self.sender_formats[address] = _format
 
 
 # Add precision to the minutes of latitude or longitude, using the APRS precision and datum option
@@ -78,8 +167,8 @@ def minute_add_precision(self, minute, dao_D, precision):
 
 # Generates a datetime object from a time object by adding the current system date
 def generate_datetime(self, time):
-    # Get the current system datetime (UTC)
-    now = datetime.datetime.utcnow()
+    # Get the current system datetime (UTC) from the clock
+    now = clock.now()
     # A datetime string is generated, using the time and the current system date
     _datetime = datetime.datetime.combine(now.date(), time)
 
@@ -112,13 +201,20 @@ def imet_unique_serial(self, _datetime, framenumber, frequency):
     # Because IMET radiosondes send one frame per second, the framenumber can be understood as the time since power on in seconds
     # time - framenumber = power on time
     power_on_time = _datetime - datetime.timedelta(seconds=framenumber)
-    # A datetime string is generated from the power on time
-    # The frequency that the IMET radiosonde transmits on is added to the string
     # The frequency is rounded to the nearest 100 kHz in order to avoid issues due to frequency drift
-    # Finally, the string 'SONDE' is added
-    temp_str = power_on_time.strftime("%Y-%m-%dT%H:%M:%SZ") + '{0:.3f}'.format(round(frequency, 1)) + ' MHz' + 'SONDE'
-    # Calculate a SHA256 hash of the string
-    serial = 'IMET-' + hashlib.sha256(temp_str.encode('ascii')).hexdigest().upper()[-8:]
+    serial = imet_unique_serial_hash(power_on_time, round(frequency, 1))
     self.loggerObj.debug('Calculated IMET unique serial (%s)', serial)
     # The hash is used as the unique serial
     return serial
+
+
+# Calculate the hash of an IMET radiosonde from its power on time and frequency
+# Power on time and frequency are the same for every package of a radiosonde, so the result is cached
+@caches.cached
+def imet_unique_serial_hash(power_on_time, frequency):
+    # A datetime string is generated from the power on time
+    # The frequency that the IMET radiosonde transmits on is added to the string
+    # Finally, the string 'SONDE' is added
+    temp_str = power_on_time.strftime("%Y-%m-%dT%H:%M:%SZ") + '{0:.3f}'.format(frequency) + ' MHz' + 'SONDE'
+    # Calculate a SHA256 hash of the string
+    return 'IMET-' + hashlib.sha256(temp_str.encode('ascii')).hexdigest().upper()[-8:]
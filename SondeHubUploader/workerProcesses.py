@@ -0,0 +1,200 @@
+# workerProcesses.py - Worker processes for processing packages on several cores
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import multiprocessing
+import queue
+import time
+import zlib
+
+
+# Processing context of a worker process
+# It holds everything that processing packages needs, just like the SondeHubUploader does
+class Worker:
+
+    import SondeHubUploader.shuConfig as shuConfig
+    import SondeHubUploader.logger as logger
+    import SondeHubUploader.crc as crc
+    import SondeHubUploader.threads as threads
+    import SondeHubUploader.handleData as handleData
+    import SondeHubUploader.writeData as writeData
+    import SondeHubUploader.telemetryChecks as telemetryChecks
+    import SondeHubUploader.utils as utils
+    import SondeHubUploader.jsonCodec as jsonCodec
+    import SondeHubUploader.caches as caches
+    import SondeHubUploader.clock as clock
+    import SondeHubUploader.admission as admission
+
+    # Init function
+    def __init__(self, args, index):
+        # Save the provided configuration parameters
+        self.__dict__.update(args)
+        self.index = index
+        # Create a logger
+        self.logger.create_logger(self, self.loglevelp, self.loglevelw, self.writel)
+        # Prepare everything that is needed for processing packages
+        self.utils.prepare_processing(self)
+
+
+# Start all worker processes
+# Each worker process has its own input queue, while all of them share a single result queue
+def start_worker_processes(self):
+    # Worker processes are spawned, so they don't inherit any thread or lock of the SondeHubUploader
+    self.worker_context = multiprocessing.get_context('spawn')
+    self.worker_input_queues = [self.worker_context.Queue(self.qin) for index in range(self.procs)]
+    self.worker_result_queue = self.worker_context.Queue()
+    self.worker_processes = [None] * self.procs
+    # Number of packages handed over to every worker process and dropped because it didn't take them
+    self.worker_statistics = [{'dispatched': 0, 'dropped': 0} for index in range(self.procs)]
+    for index in range(self.procs):
+        start_worker_process(self, index)
+
+
+# Start a single worker process (or restart it, if it died)
+def start_worker_process(self, index):
+    # The configuration parameters are passed to the worker process, so it is able to create its own processing context
+    process = self.worker_context.Process(target=run, args=(self.worker_args, index, self.worker_input_queues[index], self.worker_result_queue), name=f'worker {index}', daemon=True)
+    process.start()
+    self.worker_processes[index] = process
+    self.loggerObj.debug('Worker process %d started', index)
+
+
+# Stop all worker processes
+def stop_worker_processes(self):
+    # 'None' tells a worker process to stop after all packages before it are processed
+    # A worker process whose input queue stays full (e.g. because it died) is terminated right away
+    stopping = []
+    for index in range(self.procs):
+        try:
+            self.worker_input_queues[index].put(None, True, self.shuConfig.thread_sleep)
+            stopping.append(index)
+        except queue.Full:
+            self.worker_processes[index].terminate()
+    # Every worker process hands over its statistics before it stops
+    collect_worker_statistics(self, stopping)
+    for process in self.worker_processes:
+        process.join(self.shuConfig.thread_sleep * 5)
+        # A worker process that doesn't stop in time is terminated
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    # The queues are not used anymore
+    for input_queue in self.worker_input_queues:
+        input_queue.close()
+    self.worker_result_queue.close()
+    self.loggerObj.debug('Worker processes stopped')
+
+
+# Collect the statistics of the worker processes that are stopping
+# Reformatted telemetry that is still in the result queue is discarded, as the upload already stopped
+# The result queue must be emptied anyway, since a worker process can't stop before everything it put in the result queue was taken out
+def collect_worker_statistics(self, stopping):
+    pending = len(stopping)
+    deadline = time.monotonic() + self.shuConfig.thread_sleep * 5
+    while pending > 0 and time.monotonic() < deadline:
+        try:
+            kind, content = self.worker_result_queue.get(True, self.shuConfig.thread_sleep)
+        except queue.Empty:
+            # There is nothing left to wait for, if all worker processes that are stopping already ended
+            if not any(self.worker_processes[index].is_alive() for index in stopping):
+                break
+            continue
+        if kind == 'statistics':
+            add_worker_statistics(self, content)
+            pending -= 1
+    if pending > 0:
+        self.loggerObj.warning('Statistics of %d worker processes missing', pending)
+
+
+# Add the statistics of a worker process to the statistics of the SondeHubUploader
+def add_worker_statistics(self, statistics):
+    for reason, count in statistics['admission'].items():
+        self.admission_statistics[reason] += count
+    for site, count in statistics['failure'].items():
+        self.failure_statistics[site] += count
+    self.caches.add_cache_statistics(statistics['caches'])
+
+
+# Hand a batch of packages over to the worker processes
+# Packages are routed by the serial of their radiosonde, so all packages of a radiosonde are processed by the same worker process
+# This way, the order of the packages of a radiosonde is retained and the caches of a radiosonde stay with one worker process
+def dispatch(self, packages):
+    batches = [[] for index in range(self.procs)]
+    for package, address in packages:
+        batches[route(self, self.utils.extract_serial(package))].append((package, address))
+    # Each worker process gets its part of the batch at once
+    for index in range(self.procs):
+        if len(batches[index]) > 0:
+            put_batch(self, index, batches[index])
+
+
+# Put a batch of packages in the input queue of a worker process
+# Waiting for a full input queue is given up if the SondeHubUploader is terminated
+# Otherwise, a worker process that died with a full input queue would block closing forever, as it isn't restarted anymore
+def put_batch(self, index, batch):
+    while self.running:
+        try:
+            self.worker_input_queues[index].put(batch, True, self.shuConfig.thread_sleep)
+        except queue.Full:
+            continue
+        self.worker_statistics[index]['dispatched'] += len(batch)
+        return
+    self.worker_statistics[index]['dropped'] += len(batch)
+    self.loggerObj.warning('Input queue of worker process %d full (%d packages dropped)', index, len(batch))
+
+
+# Log the statistics of all worker processes (if there are any)
+def log_worker_statistics(self, log_function):
+    if self.procs == 0:
+        return
+    for index in range(self.procs):
+        log_function('Worker process %d (Dispatched: %d / Dropped: %d)', index, self.worker_statistics[index]['dispatched'], self.worker_statistics[index]['dropped'])
+
+
+# Get the worker process that a radiosonde is routed to
+# A CRC is used instead of 'hash', as it is the same in every process and in every run
+def route(self, serial):
+    if serial is None:
+        return 0
+    return zlib.crc32(serial) % self.procs
+
+
+# Rebuild a batch of reformatted telemetry that was processed by a worker process
+# Only the values of the records are transferred, as the record classes can't be pickled
+def rebuild_results(self, results):
+    reformatted_telemetry_batch = []
+    for values in results:
+        reformatted_telemetry = self.shuConfig.reformatted_telemetry_record()
+        reformatted_telemetry.values = values
+        reformatted_telemetry_batch.append(reformatted_telemetry)
+    return reformatted_telemetry_batch
+
+
+# Main function of a worker process
+def run(args, index, input_queue, result_queue):
+    worker = Worker(args, index)
+    worker.loggerObj.debug('Worker process %d running', index)
+    while True:
+        # Wait for a batch of packages
+        packages = input_queue.get()
+        if packages is None:
+            break
+        # All packages of a batch are processed with the same current time
+        worker.clock.tick()
+        # Errors are already contained for every single package
+        # Any other error must not end the worker process, as no further packages would be processed then
+        try:
+            reformatted_telemetry_batch = worker.threads.process_batch(worker, packages)
+        except Exception:
+            worker.failure_statistics['batch'] += 1
+            worker.loggerObj.exception('Error processing batch')
+            continue
+        # The reformatted telemetry is handed over to the upload of the SondeHubUploader
+        if len(reformatted_telemetry_batch) > 0:
+            result_queue.put(('results', [reformatted_telemetry.values for reformatted_telemetry in reformatted_telemetry_batch]))
+    # The statistics of the worker process are handed over to the SondeHubUploader, which logs them along with the statistics of all other worker processes
+    result_queue.put(('statistics', {'admission': worker.admission_statistics, 'failure': worker.failure_statistics, 'caches': worker.caches.get_cache_statistics()}))
@@ -12,100 +12,135 @@ import os.path
 
 
 # Print raw data
-def write_raw_data(self, raw_data):
+# All raw data of a batch is written at once
+def write_raw_data(self, raw_data_batch):
     # A simple text file is used
     # The name of the file is hardcoded
     filename = self.filepath + '/' + self.shuConfig.filename_raw_data + '.txt'
     try:
         f = open(filename, 'a', newline='', encoding='utf-8')
-        f.write('[' + str(datetime.datetime.now()) + '] ' + str(raw_data))
-        # All entries are separated by a new line
-        f.write('\n')
+        for raw_data in raw_data_batch:
+            # The raw data might be a view of a ring buffer slot, so it is converted to bytes first
+            f.write('[' + str(datetime.datetime.now()) + '] ' + str(bytes(raw_data)))
+            # All entries are separated by a new line
+            f.write('\n')
         f.close()
-        self.loggerObj.debug('Raw data written (%s.txt)', self.shuConfig.filename_raw_data)
+        self.loggerObj.debug('Raw data written (%s.txt, %d packages)', self.shuConfig.filename_raw_data, len(raw_data_batch))
     except OSError:
         self.loggerObj.error('Error writing raw data (%s.txt)', self.shuConfig.filename_raw_data)
 
 
-# Write unified telemetry
-def write_unified_telemetry(self, unified_telemetry):
-    # A CSV file is used
-    # A prefix indicates that the file contains unified telemetry
-    # CSV files are named by the serial of the radiosonde
-    filename = self.filepath + '/' + self.shuConfig.filename_prefix_telemetry + unified_telemetry['serial'] + '.csv'
-    # It is checked whether the file already exists
-    exists = os.path.isfile(filename)
-    status = 'File already exists' if exists else 'File does not exist'
-    self.loggerObj.debug(status + ' (' + self.shuConfig.filename_prefix_telemetry + unified_telemetry['serial'] + '.csv)')
+# Write a package that caused an error to the quarantine file
+def write_quarantine(self, site, raw_data):
+    # A simple text file is used
+    # The name of the file is hardcoded
+    filename = self.filepath + '/' + self.shuConfig.filename_quarantine + '.txt'
     try:
-        file = open(filename, 'a', newline='', encoding='utf-8')
-        writer = csv.writer(file, delimiter=',')
-        # If the file does not already exist, a headline has to be written
-        if not exists:
-            headline_list = []
-            # Go through all possible unified telemetry parameters
-            for parameter in self.shuConfig.telemetry:
-                # Build a headline string, starting with the name of the unified telemetry parameter
-                headline_string = self.shuConfig.telemetry[parameter]['name']
-                # Optionally the unit is added to the headline string
-                if self.shuConfig.telemetry[parameter]['unit'] is not None:
-                    headline_string += f' [{self.shuConfig.telemetry[parameter]["unit"]}]'
-                headline_list.append(headline_string)
-            writer.writerow(headline_list)
-            self.loggerObj.debug('Headline written (%s.csv)', self.shuConfig.filename_prefix_telemetry + unified_telemetry['serial'])
-        row_list = []
-        # Go through all possible unified telemetry parameters
-        for parameter in self.shuConfig.telemetry:
-            # Write all unified telemetry parameters that are included in 'unified_telemetry'
-            if parameter in unified_telemetry:
-                row_list.append(unified_telemetry[parameter])
-            # Write 'N/A' for all unified telemetry parameters that are not included in 'unified_telemetry'
-            else:
-                row_list.append('N/A')
-        writer.writerow(row_list)
-        file.close()
-        self.loggerObj.debug('Telemetry written (%s.csv)', self.shuConfig.filename_prefix_telemetry + unified_telemetry['serial'])
+        f = open(filename, 'a', newline='', encoding='utf-8')
+        # The site where the error occurred is written along with the raw data
+        f.write('[' + str(datetime.datetime.now()) + '] [' + site + '] ' + str(bytes(raw_data)))
+        # All entries are separated by a new line
+        f.write('\n')
+        f.close()
+        self.loggerObj.debug('Package quarantined (%s.txt)', self.shuConfig.filename_quarantine)
     except OSError:
-        self.loggerObj.error('Error writing telemetry (%s.csv)', self.shuConfig.filename_prefix_telemetry + unified_telemetry['serial'])
+        self.loggerObj.error('Error writing quarantined package (%s.txt)', self.shuConfig.filename_quarantine)
+
+
+# Group telemetry of a batch by the serial of the radiosonde
+# The order of the telemetry of each radiosonde is preserved
+def group_by_serial(telemetry_batch):
+    groups = {}
+    for telemetry in telemetry_batch:
+        groups.setdefault(telemetry['serial'], []).append(telemetry)
+    return groups
+
+
+# Write unified telemetry
+# The telemetry of a batch is grouped by radiosonde, so every file is only opened once per batch
+def write_unified_telemetry(self, unified_telemetry_batch):
+    for serial, unified_telemetry_group in group_by_serial(unified_telemetry_batch).items():
+        # A CSV file is used
+        # A prefix indicates that the file contains unified telemetry
+        # CSV files are named by the serial of the radiosonde
+        filename = self.filepath + '/' + self.shuConfig.filename_prefix_telemetry + serial + '.csv'
+        # It is checked whether the file already exists
+        exists = os.path.isfile(filename)
+        status = 'File already exists' if exists else 'File does not exist'
+        self.loggerObj.debug(status + ' (' + self.shuConfig.filename_prefix_telemetry + serial + '.csv)')
+        try:
+            file = open(filename, 'a', newline='', encoding='utf-8')
+            writer = csv.writer(file, delimiter=',')
+            # If the file does not already exist, a headline has to be written
+            if not exists:
+                headline_list = []
+                # Go through all possible unified telemetry parameters
+                for parameter in self.shuConfig.telemetry:
+                    # Build a headline string, starting with the name of the unified telemetry parameter
+                    headline_string = self.shuConfig.telemetry[parameter]['name']
+                    # Optionally the unit is added to the headline string
+                    if self.shuConfig.telemetry[parameter]['unit'] is not None:
+                        headline_string += f' [{self.shuConfig.telemetry[parameter]["unit"]}]'
+                    headline_list.append(headline_string)
+                writer.writerow(headline_list)
+                self.loggerObj.debug('Headline written (%s.csv)', self.shuConfig.filename_prefix_telemetry + serial)
+            for unified_telemetry in unified_telemetry_group:
+                row_list = []
+                # Go through all possible unified telemetry parameters
+                for parameter in self.shuConfig.telemetry:
+                    # Write all unified telemetry parameters that are included in 'unified_telemetry'
+                    if parameter in unified_telemetry:
+                        row_list.append(unified_telemetry[parameter])
+                    # Write 'N/A' for all unified telemetry parameters that are not included in 'unified_telemetry'
+                    else:
+                        row_list.append('N/A')
+                writer.writerow(row_list)
+            file.close()
+            self.loggerObj.debug('Telemetry written (%s.csv, %d packages)', self.shuConfig.filename_prefix_telemetry + serial, len(unified_telemetry_group))
+        except OSError:
+            self.loggerObj.error('Error writing telemetry (%s.csv)', self.shuConfig.filename_prefix_telemetry + serial)
 
 
 # Write reformatted telemetry
-def write_reformatted_telemetry(self, reformatted_telemetry):
-    # A CSV file is used
-    # A prefix indicates that the file contains reformatted telemetry
-    # CSV files are named by the serial of the radiosonde
-    filename = self.filepath + '/' + self.shuConfig.filename_prefix_reformatted_telemetry + reformatted_telemetry['serial'] + '.csv'
-    # It is checked whether the file already exists
-    exists = os.path.isfile(filename)
-    status = 'File already exists' if exists else 'File does not exist'
-    self.loggerObj.debug(status + ' (' + self.shuConfig.filename_prefix_reformatted_telemetry + reformatted_telemetry['serial'] + '.csv)')
-    try:
-        file = open(filename, 'a', newline='', encoding='utf-8')
-        writer = csv.writer(file, delimiter=',')
-        # If the file does not already exist, a headline has to be written
-        if not exists:
-            headline_list = []
-            # Go through all possible reformatted telemetry parameters
-            for name, unit in self.shuConfig.reformatted_telemetry.items():
-                # Build a headline string, starting with the name of the reformatted telemetry parameter
-                headline_string = name
-                # Optionally the unit is added to the headline string
-                if unit is not None:
-                    headline_string += f' [{unit}]'
-                headline_list.append(headline_string)
-            writer.writerow(headline_list)
-            self.loggerObj.debug('Headline written (%s.csv)', self.shuConfig.filename_prefix_reformatted_telemetry + reformatted_telemetry['serial'])
-        row_list = []
-        # Go through all possible reformatted telemetry parameters
-        for name, unit in self.shuConfig.reformatted_telemetry.items():
-            # Write all reformatted telemetry parameters that are included in 'reformatted_telemetry'
-            if name in reformatted_telemetry.keys():
-                row_list.append(reformatted_telemetry[name])
-            # Write 'N/A' for all reformatted telemetry parameters that are not included in 'reformatted_telemetry'
-            else:
-                row_list.append('N/A')
-        writer.writerow(row_list)
-        file.close()
-        self.loggerObj.debug('Reformatted telemetry written (%s.csv)', self.shuConfig.filename_prefix_reformatted_telemetry + reformatted_telemetry['serial'])
-    except OSError:
-        self.loggerObj.error('Error writing reformatted telemetry (%s.csv)', self.shuConfig.filename_prefix_reformatted_telemetry + reformatted_telemetry['serial'])
+# The telemetry of a batch is grouped by radiosonde, so every file is only opened once per batch
+def write_reformatted_telemetry(self, reformatted_telemetry_batch):
+    for serial, reformatted_telemetry_group in group_by_serial(reformatted_telemetry_batch).items():
+        # A CSV file is used
+        # A prefix indicates that the file contains reformatted telemetry
+        # CSV files are named by the serial of the radiosonde
+        filename = self.filepath + '/' + self.shuConfig.filename_prefix_reformatted_telemetry + serial + '.csv'
+        # It is checked whether the file already exists
+        exists = os.path.isfile(filename)
+        status = 'File already exists' if exists else 'File does not exist'
+        self.loggerObj.debug(status + ' (' + self.shuConfig.filename_prefix_reformatted_telemetry + serial + '.csv)')
+        try:
+            file = open(filename, 'a', newline='', encoding='utf-8')
+            writer = csv.writer(file, delimiter=',')
+            # If the file does not already exist, a headline has to be written
+            if not exists:
+                headline_list = []
+                # Go through all possible reformatted telemetry parameters
+                for name, unit in self.shuConfig.reformatted_telemetry.items():
+                    # Build a headline string, starting with the name of the reformatted telemetry parameter
+                    headline_string = name
+                    # Optionally the unit is added to the headline string
+                    if unit is not None:
+                        headline_string += f' [{unit}]'
+                    headline_list.append(headline_string)
+                writer.writerow(headline_list)
+                self.loggerObj.debug('Headline written (%s.csv)', self.shuConfig.filename_prefix_reformatted_telemetry + serial)
+            for reformatted_telemetry in reformatted_telemetry_group:
+                row_list = []
+                # Go through all possible reformatted telemetry parameters
+                for name, unit in self.shuConfig.reformatted_telemetry.items():
+                    # Write all reformatted telemetry parameters that are included in 'reformatted_telemetry'
+                    if name in reformatted_telemetry:
+                        row_list.append(reformatted_telemetry[name])
+                    # Write 'N/A' for all reformatted telemetry parameters that are not included in 'reformatted_telemetry'
+                    else:
+                        row_list.append('N/A')
+                writer.writerow(row_list)
+            file.close()
+            self.loggerObj.debug('Reformatted telemetry written (%s.csv, %d packages)', self.shuConfig.filename_prefix_reformatted_telemetry + serial, len(reformatted_telemetry_group))
+        except OSError:
+            self.loggerObj.error('Error writing reformatted telemetry (%s.csv)', self.shuConfig.filename_prefix_reformatted_telemetry + serial)
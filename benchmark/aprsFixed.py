@@ -0,0 +1,82 @@
+# aprsFixed.py - Benchmark for decoding the fixed position parameters of APRS packages
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import timeit
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.handleData as handleData
+import corpus
+import standIn
+
+
+# The way the destination/source address was parsed before (character by character)
+def parse_aprs_address_reference(address):
+    address_string = ''
+    for i in range(len(address) - 1):
+        address_string += chr(address[i] >> 1)
+    address_string += '-' + str(int(format(address[len(address) - 1], '08b')[3:7], 2))
+    return address_string
+
+
+# Parse the fixed position parameters one by one (the way it was done before)
+def parse_single(parser, package):
+    aprs_telemetry = {}
+    handleData.parse_aprs_fixed_position_single(parser, package, aprs_telemetry)
+    return aprs_telemetry
+
+
+# Parse the fixed position parameters at once, falling back to parsing them one by one
+def parse_struct(parser, package):
+    aprs_telemetry = handleData.parse_aprs_fixed_position(parser, package)
+    if aprs_telemetry is None:
+        aprs_telemetry = parse_single(parser, package)
+    return aprs_telemetry
+
+
+# Verify that both decoders produce the same APRS telemetry
+# Returns the number of mismatches
+def verify(parser, packages):
+    mismatches = 0
+    for package in packages:
+        single = parse_single(parser, package)
+        fast = parse_struct(parser, package)
+        # The order of the parameters matters as well, as it determines the order of the columns when writing the telemetry
+        if list(single.items()) != list(fast.items()):
+            mismatches += 1
+    # The address translation table must give the same result for every possible byte
+    for i in range(256):
+        address = bytes([i] * 7)
+        if handleData.parse_aprs_address(address) != parse_aprs_address_reference(address):
+            mismatches += 1
+    return mismatches
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for decoding the fixed position parameters of APRS packages')
+    argumentParser.add_argument('-n', '--count', type=int, default=20000, help='Number of iterations per measurement')
+    arguments = argumentParser.parse_args()
+
+    # The parse functions only need the stand-in itself
+    parser = standIn.StandIn()
+    # The packages are parsed without their CRC
+    packages = [package[:-2] for package in corpus.aprs_packages.values()]
+    # The verification also covers truncated packages, packages with limited precision and invalid packages
+    variants = [package[:length] for package in packages for length in range(0, 80)]
+    variants += [package[:36] + b'  .  ' + package[41:46] + b'4 .  ' + package[51:] for package in packages]
+    variants += [package[:27] + b'xx' + package[29:] for package in packages]
+    mismatches = verify(parser, packages + variants)
+    print('Verification: {:d} packages, {:d} mismatches'.format(len(packages) + len(variants), mismatches))
+    if mismatches > 0:
+        sys.exit(1)
+
+    for name, function in [('single', parse_single), ('struct', parse_struct)]:
+        duration = timeit.timeit(lambda: [function(parser, package) for package in packages], number=arguments.count)
+        print('{:<6} {:>7.2f} us/package'.format(name, duration / arguments.count / len(packages) * 1e6))
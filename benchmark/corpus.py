@@ -0,0 +1,26 @@
+# corpus.py - Exemplary packages for the benchmarks of the SondeHubUploader
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# APRS packages (as sent out by sondemod), one for every radiosonde type
+# All of them were received on 2023-05-01 at 12:34:56 UTC and end with their CRC (low byte first)
+aprs_packages = {
+    'RS41': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;S1234567 *123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=-5.5m/s t=-48.9C h=2.1% p=199.5hPa 405.100MHz Type=RS41-SGP FN=3000 Sats=10 batt=2.7V calibration 100% rx=405100(+1/5) OG=1234m hdil=2.0m azimuth=123 elevation=10.5 dist=45.6 dev=RTL0 powerup=1h2m3s TxPastBurst=0h10m5sb\x94',
+    'DFM': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;D12345678*123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 403.000MHz Type=DFM17 Sats=8 rx=403000(-2/3) dev=RTL1\x99\xff',
+    'M10': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;ME9A2C3D4*123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 405.300MHz Type=M10 Sats=8 rx=405300(-2/3) batt=2.9V9\x1e',
+    'M20': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;ME1234567*123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 405.400MHz Type=M20 ser=123-4-56789[1] Sats=8 rx=405400(-2/3)\xbfB',
+    'iMET': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;IMET1234 *123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 403.010MHz Type=iMET FN=500 Sats=8 rx=403010(-2/3) t=-10.0C\xd1\xb8',
+    'MRZ': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;MRZ12345 *123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 404.010MHz Type=MRZ ser=MRZ-1234 Sats=8\xb6\x8b',
+    'IMS100': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;IMS12345 *123456h4807.40N/01134.07EO123/045/A=012345!W5 !Clb=3.1m/s 404.110MHz Type=IMS100 ser=IMS100-12345678 FN=700 Sats=8\xefK',
+    'MEISEI': b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;IMS22345 *123456h4807.40N/01134.07EO123/045/A=012345!w3s!Clb=3.1m/s 404.120MHz Type=MEISEI ser=IMS100-22345678 FN=800 Sats=8O]',
+}
+
+
+# JSON packages (as sent out by rdzwx-go / radiosonde_auto_rx)
+json_packages = {
+    'RS41': b'{"id": "S2234567", "type": "RS41", "ser": "RS41-SG", "uid": "DL1ABC-10", "date": "2023-05-01", "time": "12:34:56", "leaps": 18, "lat": 48.5, "long": 11.2, "alt": 1234.5, "egmalt": 1200.0, "og": 800, "ant": {"az": 12, "el": 3.5, "d": 10.5}, "clb": 5.1, "spd": 20.0, "dir": 90, "ptu": {"t": -5.0, "p": 850.0, "h": 50.0}, "mhz": 402.5, "sdr": {"rx": 402.5, "afc": 1, "mafc": 5, "rssi": 40.0}, "txpo": 50, "up": 4000, "bursttx": 30600, "ub": 2.8, "sat": 9, "satdb": [10, 20, -1], "rxid": "RTL0", "xdata": [1, 48, 65]}',
+    'DFM': b'{"id": "D22345678", "type": "DFM09", "uid": "DL1ABC-10", "time": "12:34:56", "lat": 48.5, "long": 11.2, "alt": 1234.5, "clb": 5.1, "spd": 20.0, "dir": 90, "sdr": {"rx": 403.5}}'
+}
@@ -0,0 +1,89 @@
+# crc16.py - Verification and benchmark of the CRC-16/X.25 calculator of the SondeHubUploader
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import random
+import timeit
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.crc as shuCrc
+import corpus
+# Optional modules
+# The crc package is only needed as a reference
+try:
+    import crc
+except ImportError:
+    crc = None
+
+
+# Build the corpus for the verification
+# It consists of all exemplary APRS packages, copies of them with a single corrupted byte and random data
+def build_corpus(count):
+    frames = list(corpus.aprs_packages.values())
+    generator = random.Random(0)
+    for i in range(count):
+        frame = bytearray(generator.choice(list(corpus.aprs_packages.values())))
+        frame[generator.randrange(len(frame))] ^= generator.randrange(1, 256)
+        frames.append(bytes(frame))
+        frames.append(generator.randbytes(generator.randrange(0, 300)))
+    return frames
+
+
+# Verify the table-driven calculator against the crc package
+# Returns the number of mismatches
+def verify(calculator, reference, frames):
+    mismatches = 0
+    for frame in frames:
+        view = memoryview(frame).toreadonly()
+        if calculator.checksum(view) != reference.checksum(frame):
+            mismatches += 1
+        expected = frame[-1] << 8 | frame[-2] if len(frame) >= 2 else None
+        if calculator.verify_frame(view) != (expected is not None and reference.verify(frame[:-2], expected)):
+            mismatches += 1
+    if calculator.verify_batch([memoryview(frame) for frame in frames]) != [calculator.verify_frame(frame) for frame in frames]:
+        mismatches += 1
+    return mismatches
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Verification and benchmark of the CRC-16/X.25 calculator of the SondeHubUploader')
+    argumentParser.add_argument('-n', '--count', type=int, default=20000, help='Number of iterations per measurement')
+    argumentParser.add_argument('-c', '--corpus', type=int, default=5000, help='Number of corrupted and random frames used for the verification')
+    arguments = argumentParser.parse_args()
+
+    calculator = shuCrc.Crc16(0x1021, 0xFFFF, 0xFFFF)
+    # All exemplary packages must pass the verification
+    if not all(calculator.verify_batch(corpus.aprs_packages.values())):
+        sys.exit('Exemplary packages failed the verification')
+
+    reference = None
+    if crc is not None:
+        reference = crc.Calculator(crc.Configuration(width=16, polynomial=0x1021, init_value=0xFFFF, final_xor_value=0xFFFF,
+                                                     reverse_input=True, reverse_output=True))
+        frames = build_corpus(arguments.corpus)
+        mismatches = verify(calculator, reference, frames)
+        print('Verification against the crc package: {:d} frames, {:d} mismatches'.format(len(frames), mismatches))
+        if mismatches > 0:
+            sys.exit(1)
+    else:
+        print('crc is not installed, skipping verification')
+
+    # Measure the time per frame in microseconds, the frames are verified from views like they are taken from the ring buffers
+    views = [memoryview(frame).toreadonly() for frame in corpus.aprs_packages.values()]
+    calculators = [('table', calculator)]
+    if reference is not None:
+        calculators.insert(0, ('crc', reference))
+    for name, candidate in calculators:
+        single_time = timeit.timeit(lambda: [candidate.verify(view[:-2], view[-1] << 8 | view[-2]) for view in views], number=arguments.count) / arguments.count / len(views) * 1e6
+        print('{:<6} verify: {:>7.2f} us/frame'.format(name, single_time))
+    frame_time = timeit.timeit(lambda: [calculator.verify_frame(view) for view in views], number=arguments.count) / arguments.count / len(views) * 1e6
+    print('{:<6} frame:  {:>7.2f} us/frame'.format('table', frame_time))
+    batch_time = timeit.timeit(lambda: calculator.verify_batch(views), number=arguments.count) / arguments.count / len(views) * 1e6
+    print('{:<6} batch:  {:>7.2f} us/frame'.format('table', batch_time))
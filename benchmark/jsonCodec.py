@@ -0,0 +1,72 @@
+# jsonCodec.py - Benchmark for the JSON backends of the SondeHubUploader
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import json
+import timeit
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.jsonCodec as jsonCodec
+
+
+# Exemplary JSON package (as sent out by rdzwx-go / radiosonde_auto_rx)
+package = b'{"id": "S1234567", "type": "RS41", "ser": "RS41-SG", "uid": "DL1ABC-10", "date": "2023-05-01", ' \
+          b'"time": "12:34:56", "leaps": 18, "lat": 48.5, "long": 11.2, "alt": 1234.5, "egmalt": 1200.0, "og": 800, ' \
+          b'"ant": {"az": 12, "el": 3.5, "d": 10.5}, "clb": 5.1, "spd": 20.0, "dir": 90, ' \
+          b'"ptu": {"t": -5.0, "p": 850.0, "h": 50.0}, "mhz": 402.5, "sdr": {"rx": 402.5, "afc": 1, "mafc": 5, "rssi": 40.0}, ' \
+          b'"txpo": 50, "up": 4000, "bursttx": 30600, "ub": 2.8, "sat": 9, "satdb": [10, 20, -1], "rxid": "RTL0", "xdata": [1, 48, 65]}'
+
+# Exemplary reformatted telemetry (as uploaded to SondeHub)
+telemetry = {
+    'software_name': 'dxlAPRS-SHUE', 'software_version': '1.1.0', 'uploader_callsign': 'DL1ABC-10',
+    'time_received': '2023-05-01T12:34:57.123456Z', 'manufacturer': 'Vaisala', 'type': 'RS41', 'subtype': 'RS41-SG',
+    'serial': 'S1234567', 'frame': 4000, 'datetime': '2023-05-01T12:34:56.000000Z', 'lat': 48.5, 'lon': 11.2,
+    'alt': 1234.5, 'temp': -5.0, 'humidity': 50.0, 'pressure': 850.0, 'vel_v': 5.1, 'vel_h': 5.56, 'heading': 90,
+    'sats': 9, 'batt': 2.8, 'frequency': 402.5, 'tx_frequency': 402.5, 'burst_timer': 30600, 'rssi': 40.0,
+    'uploader_position': [48.1, 11.5, 500.0], 'uploader_antenna': '1/4 wave monopole'
+}
+
+
+# The way JSON packages were parsed before: Once for checking and once for decoding
+def loads_twice(data):
+    try:
+        json.loads(str(data, 'utf-8'))
+    except ValueError:
+        return None
+    return json.loads(str(data, 'utf-8'))
+
+
+# Measure the time per call of a function in microseconds
+def measure(function, argument, count):
+    return timeit.timeit(lambda: function(argument), number=count) / count * 1e6
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for the JSON backends of the SondeHubUploader')
+    argumentParser.add_argument('-n', '--count', type=int, default=100000, help='Number of iterations per measurement')
+    argumentParser.add_argument('-b', '--batch', type=int, default=100, help='Number of telemetry packages per upload batch')
+    arguments = argumentParser.parse_args()
+
+    # The packages are parsed from a view, just like they are taken from the ring buffers
+    view = memoryview(package).toreadonly()
+    batch = [telemetry] * arguments.batch
+    backends = [('json (twice)', loads_twice, None), ('json', jsonCodec.loads_stdlib, jsonCodec.dumps_stdlib)]
+    if jsonCodec.orjson is not None:
+        backends.append(('orjson', jsonCodec.loads_orjson, jsonCodec.dumps_orjson))
+    else:
+        print('orjson is not installed, skipping')
+
+    for name, loads, dumps in backends:
+        parse_time = measure(loads, view, arguments.count)
+        if dumps is not None:
+            serialise_time = measure(dumps, batch, max(arguments.count // arguments.batch, 1))
+            print('{:<12} parse: {:>7.2f} us/package, serialise: {:>8.2f} us/batch of {:d}'.format(name, parse_time, serialise_time, arguments.batch))
+        else:
+            print('{:<12} parse: {:>7.2f} us/package'.format(name, parse_time))
@@ -0,0 +1,86 @@
+# receive.py - Benchmark for the receive modes of the SondeHubUploader
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import socket
+import threading
+import time
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.threads as threads
+from SondeHubUploader.ringBuffer import RingBuffer
+import standIn
+
+
+# Exemplary APRS package (as sent out by sondemod)
+package = b'\x82\xa0\x98\xae\xa6d`\x88\x98b\x82\x84\x86u\x03\xf0;S1234567 *001036h4807.40N/01134.07EO123/045/A=012345!w3s!' \
+          b'Clb=-5.5m/s t=-48.9C h=2.1% p=199.5hPa 405.100MHz Type=RS41-SGP FN=3000 Sats=10 batt=2.7V rx=405100(+1/5)j\x9f'
+
+
+# Send packages to the receiver as fast as possible
+def send(port, count):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for i in range(count):
+        sock.sendto(package, ('127.0.0.1', port))
+        # Give the receiver a chance to keep up, so that the socket buffer does not overflow
+        if i % 64 == 63:
+            time.sleep(0)
+    sock.close()
+
+
+# Measure the packages per second for a single receive mode
+def run(port, recvm, count):
+    # The receive thread needs a single listener along with its statistics and ring buffer
+    receiver = standIn.StandIn(listeners=[('127.0.0.1', port)], listener_statistics=[{'received': 0, 'dropped': 0, 'overruns': 0}], recvm=recvm, running=True,
+                               input_rings=[RingBuffer(4096, 1024)], input_event=threading.Event())
+    receive_thread = threading.Thread(target=threads.receive, args=(receiver, 0))
+    receive_thread.start()
+    # Give the receive thread some time to bind the socket
+    time.sleep(0.2)
+
+    send_thread = threading.Thread(target=send, args=(port, count))
+    start_time = time.perf_counter()
+    send_thread.start()
+    received = 0
+    wakeups = 0
+    end_time = start_time
+    ring = receiver.input_rings[0]
+    # Take packages from the ring buffer until all packages arrived or no package arrived for a while
+    while received < count:
+        receiver.input_event.clear()
+        available = ring.available()
+        if available == 0:
+            if not receiver.input_event.wait(1):
+                break
+            wakeups += 1
+            continue
+        for i in range(available):
+            ring.read_slot()
+            ring.release()
+        received += available
+        end_time = time.perf_counter()
+    send_thread.join()
+
+    # Stop the receive thread
+    receiver.running = False
+    receive_thread.join()
+    return received, wakeups, end_time - start_time
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for the receive modes of the SondeHubUploader')
+    argumentParser.add_argument('-p', '--port', type=int, default=18101, help='Port used for the benchmark')
+    argumentParser.add_argument('-n', '--count', type=int, default=100000, help='Number of packages sent per run')
+    arguments = argumentParser.parse_args()
+
+    for name, recvm in [('single', 0), ('batched', 1)]:
+        received, wakeups, duration = run(arguments.port, recvm, arguments.count)
+        print('{:<8} {:>8d} packages received ({:.1f} % loss), {:>8d} wakeups, {:>10.0f} packages/s'.format(
+            name, received, (1 - received / arguments.count) * 100, wakeups, received / duration))
@@ -0,0 +1,36 @@
+# standIn.py - Stand-in for the SondeHubUploader used by the benchmarks
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import logging
+# Own modules
+import SondeHubUploader.shuConfig as shuConfig
+import SondeHubUploader.utils as utils
+import SondeHubUploader.caches as caches
+import SondeHubUploader.logger as logger
+
+
+# Station data, for benchmarks that reformat telemetry
+station = {'call': None, 'ant': '1/4 wave monopole', 'uploader_position': [48.1, 11.5, 500.0]}
+
+
+# Minimal stand-in for the SondeHubUploader
+# It holds the modules and the logger that the functions of the SondeHubUploader use
+# Everything else a benchmark needs is passed in as attributes
+class StandIn:
+    shuConfig = shuConfig
+    utils = utils
+    caches = caches
+
+    # Init function
+    def __init__(self, **attributes):
+        # The functions of the SondeHubUploader also log on the custom logging level
+        logger.add_logging_level('DEBUG_DETAIL', shuConfig.loglevel[5])
+        # Errors are expected for some packages (e.g. truncated ones), so nothing is logged
+        self.loggerObj = logging.getLogger('benchmark')
+        self.loggerObj.setLevel(logging.CRITICAL)
+        self.__dict__.update(attributes)
@@ -0,0 +1,61 @@
+# telemetryMemory.py - Benchmark for the memory needed by queued telemetry
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import tracemalloc
+import datetime
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.handleData as handleData
+import SondeHubUploader.telemetryChecks as telemetryChecks
+import SondeHubUploader.utils as utils
+import corpus
+import standIn
+
+
+# Process all packages up to the point where they would be put in the upload queue
+def process(processor, packages):
+    queued = []
+    for package in packages:
+        unified_telemetry = handleData.unify_aprs(processor, handleData.parse_aprs(processor, package[:-2]))
+        unified_telemetry = telemetryChecks.check_plausibility(processor, unified_telemetry)
+        radiosonde = utils.resolve_radiosonde(processor, unified_telemetry)
+        if telemetryChecks.check_mandatory(processor, unified_telemetry, radiosonde):
+            queued.append(handleData.reformat_telemetry(processor, unified_telemetry, radiosonde))
+    return queued
+
+
+# Measure the memory in bytes that is allocated for every queued package
+def measure(processor, packages, count, convert):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    queue = []
+    for i in range(count):
+        queue.extend(convert(reformatted_telemetry) for reformatted_telemetry in process(processor, packages))
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size / len(queue)
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for the memory needed by queued telemetry')
+    argumentParser.add_argument('-n', '--count', type=int, default=1000, help='Number of times every package is queued')
+    arguments = argumentParser.parse_args()
+
+    # Processing a package needs the station data, the parse profiles and the mandatory parameters
+    processor = standIn.StandIn(**standIn.station)
+    handleData.create_parse_profiles(processor)
+    telemetryChecks.create_mandatory_parameters(processor)
+    # The time of the recorded packages is replaced with the current time, so that it is plausible
+    now = datetime.datetime.utcnow().strftime('%H%M%S').encode()
+    packages = [package[:27] + now + package[33:] for package in corpus.aprs_packages.values()]
+    # Reformatted telemetry used to be stored in dictionaries
+    for name, convert in [('dict', lambda record: record.to_dict()), ('record', lambda record: record)]:
+        print('{:<6} {:>6.0f} bytes per queued package'.format(name, measure(processor, packages, arguments.count, convert)))
@@ -0,0 +1,108 @@
+# timestamp.py - Benchmark for generating the datetime and the GPS framenumber of reformatted telemetry
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import timeit
+import datetime
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.shuConfig as shuConfig
+import SondeHubUploader.handleData as handleData
+import SondeHubUploader.timestamp as timestamp
+import corpus
+import standIn
+
+
+# Generate the datetime and the framenumber the way it was done before (strftime, strptime and timedeltas)
+def reformat_reference(radiosonde, _datetime, leap_seconds):
+    if leap_seconds is not None:
+        if radiosonde['radiosonde_time_reference'] == radiosonde['sondehub_time_reference']:
+            _datetime += datetime.timedelta(seconds=leap_seconds)
+        elif radiosonde['radiosonde_time_reference'] == 'UTC' and radiosonde['sondehub_time_reference'] == 'GPS':
+            _datetime += datetime.timedelta(seconds=shuConfig.leap_seconds)
+    elif radiosonde['sondehub_time_reference'] == 'GPS':
+        _datetime += datetime.timedelta(seconds=shuConfig.leap_seconds)
+    datetime_string = _datetime.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    frame = int((datetime.datetime.strptime(datetime_string, '%Y-%m-%dT%H:%M:%S.%fZ') - datetime.datetime(1980, 1, 6, 0, 0, 0)).total_seconds())
+    if radiosonde['radiosonde_time_reference'] == 'GPS' and radiosonde['sondehub_time_reference'] == 'UTC':
+        frame += leap_seconds if leap_seconds is not None else shuConfig.leap_seconds
+    elif radiosonde['radiosonde_time_reference'] == 'UTC' and radiosonde['sondehub_time_reference'] == 'GPS':
+        frame -= leap_seconds if leap_seconds is not None else shuConfig.leap_seconds
+    return datetime_string, frame
+
+
+# Generate the datetime and the framenumber using GPS seconds (the way reformat_telemetry does it now)
+def reformat_timestamp(radiosonde, _datetime, leap_seconds):
+    seconds = timestamp.gps_seconds(_datetime)
+    microsecond = _datetime.microsecond
+    if leap_seconds is not None:
+        if radiosonde['radiosonde_time_reference'] == radiosonde['sondehub_time_reference']:
+            seconds, microsecond = timestamp.add_seconds(seconds, microsecond, leap_seconds)
+        elif radiosonde['radiosonde_time_reference'] == 'UTC' and radiosonde['sondehub_time_reference'] == 'GPS':
+            seconds, microsecond = timestamp.add_seconds(seconds, microsecond, shuConfig.leap_seconds)
+    elif radiosonde['sondehub_time_reference'] == 'GPS':
+        seconds, microsecond = timestamp.add_seconds(seconds, microsecond, shuConfig.leap_seconds)
+    datetime_string = timestamp.format_iso(seconds, microsecond)
+    frame = seconds
+    if radiosonde['radiosonde_time_reference'] == 'GPS' and radiosonde['sondehub_time_reference'] == 'UTC':
+        frame += leap_seconds if leap_seconds is not None else shuConfig.leap_seconds
+    elif radiosonde['radiosonde_time_reference'] == 'UTC' and radiosonde['sondehub_time_reference'] == 'GPS':
+        frame -= leap_seconds if leap_seconds is not None else shuConfig.leap_seconds
+    return datetime_string, frame
+
+
+# Verify that reformat_telemetry produces the same datetime and framenumber as before
+# Returns the number of mismatches
+def verify(reformatter, names, datetimes, leap_seconds):
+    mismatches = 0
+    for name in names:
+        unified_telemetry = handleData.unify_aprs(reformatter, handleData.parse_aprs(reformatter, corpus.aprs_packages[name][:-2]))
+        for _datetime in datetimes:
+            unified_telemetry['date'] = _datetime.date()
+            unified_telemetry['time'] = _datetime.time()
+            for leap in leap_seconds:
+                if leap is None:
+                    if 'leap_seconds' in unified_telemetry:
+                        unified_telemetry.pop('leap_seconds')
+                else:
+                    unified_telemetry['leap_seconds'] = leap
+                reformatted_telemetry = handleData.reformat_telemetry(reformatter, unified_telemetry, name)
+                if (reformatted_telemetry['datetime'], reformatted_telemetry['frame']) != reformat_reference(shuConfig.radiosonde[name], _datetime, leap):
+                    mismatches += 1
+    return mismatches
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for generating the datetime and the GPS framenumber of reformatted telemetry')
+    argumentParser.add_argument('-n', '--count', type=int, default=20000, help='Number of iterations per measurement')
+    arguments = argumentParser.parse_args()
+
+    # Reformatting telemetry needs the station data and the parse profiles
+    reformatter = standIn.StandIn(**standIn.station)
+    handleData.create_parse_profiles(reformatter)
+    # Only radiosondes that use the GPS seconds as framenumber are covered
+    names = ['DFM', 'M10', 'M20', 'MRZ']
+    # The verification covers day, month and year boundaries, microseconds and leap seconds of different kinds
+    datetimes = [datetime.datetime(2023, 5, 1, 12, 34, 56)]
+    datetimes += [datetime.datetime(year, month, 1) + datetime.timedelta(seconds=offset) for year in [1999, 2023, 2024] for month in [1, 2, 3, 12] for offset in [-19, -1, 0, 17, 86399]]
+    datetimes += [datetime.datetime(2023, 5, 1, 23, 59, 59, 999999), datetime.datetime(2024, 2, 29, 0, 0, 0, 1)]
+    leap_seconds = [None, 0, 18, 18.0, 17.5]
+    mismatches = verify(reformatter, names, datetimes, leap_seconds)
+    print('Verification: {:d} timestamps, {:d} mismatches'.format(len(names) * len(datetimes) * len(leap_seconds), mismatches))
+    if mismatches > 0:
+        sys.exit(1)
+
+    # All packages of a batch are received within a few seconds
+    _datetime = datetime.datetime(2023, 5, 1, 12, 34, 56)
+    for name in names:
+        radiosonde = shuConfig.radiosonde[name]
+        for label, function in [('reference', reformat_reference), ('timestamp', reformat_timestamp)]:
+            duration = timeit.timeit(lambda: function(radiosonde, _datetime, 18), number=arguments.count)
+            print('{:<4} {:<9} {:>6.2f} us/package'.format(name, label, duration / arguments.count * 1e6))
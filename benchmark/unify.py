@@ -0,0 +1,128 @@
+# unify.py - Benchmark for the unification of JSON and APRS telemetry
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import json
+import timeit
+import argparse
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import SondeHubUploader.handleData as handleData
+import corpus
+import standIn
+
+
+# The way JSON telemetry was unified before (loop over the telemetry definitions)
+def unify_json_reference(self, json_telemetry):
+    unified_telemetry = {}
+
+    # Go through all possible telemetry parameters
+    for parameter in self.shuConfig.telemetry:
+        try:
+            # Check whether the telemetry parameter actually exists in JSON telemetry
+            if self.shuConfig.telemetry[parameter]['json_source'] is not None:
+                # Check whether the data type of the JSON source of the telemetry parameter is string, list or tuple
+                if type(self.shuConfig.telemetry[parameter]['json_source']) == str:
+                    # Telemetry parameters with a string JSON source can be unified directly using the JSON conversion function
+                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](json_telemetry[self.shuConfig.telemetry[parameter]['json_source']])
+                elif type(self.shuConfig.telemetry[parameter]['json_source']) == list:
+                    # Telemetry parameters with a list JSON source are contained within a sub-dictionary
+                    # The list JSON source provides the keys necessary to access the telemetry parameter within the sub-dictionary
+                    # Other than that, the telemetry parameters can be unified directly using the JSON conversion function
+                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](json_telemetry[self.shuConfig.telemetry[parameter]['json_source'][0]][self.shuConfig.telemetry[parameter]['json_source'][1]])
+                elif type(self.shuConfig.telemetry[parameter]['json_source']) == tuple:
+                    # Telemetry parameters with a tuple JSON source can be sourced from multiple JSON telemetry parameters
+                    # These JSON telemetry parameters are compiled in a parameter list
+                    parameter_list = []
+                    for element in self.shuConfig.telemetry[parameter]['json_source']:
+                        # The individual JSON telemetry parameters of type string or list (see above)
+                        if type(element) == str:
+                            parameter_list.append(json_telemetry[element] if element in json_telemetry else None)
+                        elif type(element) == list:
+                            parameter_list.append(
+                                json_telemetry[element[0]][element[1]] if element[0] in json_telemetry and element[1] in json_telemetry[element[0]] else None)
+                    # Source selection and unification are done by the JSON conversion function
+                    # The JSON conversion function will return None in case of an error
+                    if self.shuConfig.telemetry[parameter]['json_conversion_function'](*parameter_list) is not None:
+                        unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['json_conversion_function'](*parameter_list)
+                    else:
+                        # Raise a KeyError in order to get a proper debug message (see below)
+                        raise KeyError
+                self.loggerObj.debug_detail(f'Parameter "{parameter}" unified')
+            else:
+                self.loggerObj.debug_detail(f'Parameter "{parameter}" does not exist in JSON telemetry')
+        except KeyError:
+            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in JSON telemetry')
+    return unified_telemetry
+
+
+# The way APRS telemetry was unified before (loop over the telemetry definitions)
+def unify_aprs_reference(self, aprs_telemetry):
+    unified_telemetry = {}
+
+    # Go through all possible telemetry parameters
+    for parameter in self.shuConfig.telemetry:
+        try:
+            # Check whether the telemetry parameter actually exists in APRS telemetry
+            if self.shuConfig.telemetry[parameter]['aprs_source'] is not None:
+                # Check whether the data type of the APRS source of the telemetry parameter is string or tuple
+                if type(self.shuConfig.telemetry[parameter]['aprs_source']) == str:
+                    # Telemetry parameters with a string APRS source can be unified directly using the APRS conversion function
+                    unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['aprs_conversion_function'](aprs_telemetry[self.shuConfig.telemetry[parameter]['aprs_source']])
+                elif type(self.shuConfig.telemetry[parameter]['aprs_source']) == tuple:
+                    # Telemetry parameters with a tuple APRS source must be compiled from multiple APRS telemetry parameters
+                    # These APRS telemetry parameters are compiled in a parameter list
+                    parameter_list = []
+                    for element in self.shuConfig.telemetry[parameter]['aprs_source']:
+                        parameter_list.append(aprs_telemetry[element] if element in aprs_telemetry else None)
+                    # Compiling and unification are done by the APRS conversion function
+                    # The APRS conversion function will return None in case of an error
+                    if self.shuConfig.telemetry[parameter]['aprs_conversion_function'](*parameter_list) is not None:
+                        unified_telemetry[parameter] = self.shuConfig.telemetry[parameter]['aprs_conversion_function'](*parameter_list)
+                    else:
+                        # Raise a KeyError in order to get a proper debug message (see below)
+                        raise KeyError
+                self.loggerObj.debug_detail(f'Parameter "{parameter}" unified')
+            else:
+                self.loggerObj.debug_detail(f'Parameter "{parameter}" does not exist in APRS telemetry')
+        except KeyError:
+            self.loggerObj.debug_detail(f'Parameter "{parameter}" not found in APRS telemetry')
+    return unified_telemetry
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for the unification of JSON and APRS telemetry')
+    argumentParser.add_argument('-n', '--count', type=int, default=20000, help='Number of iterations per measurement')
+    arguments = argumentParser.parse_args()
+
+    # The unification needs the parse profiles and the unification plan for JSON
+    unifier = standIn.StandIn()
+    handleData.create_parse_profiles(unifier)
+    handleData.create_unification_plan_json(unifier)
+    # The recorded packages are parsed once up front, only the unification is measured
+    telemetry = {
+        'JSON': [json.loads(package) for package in corpus.json_packages.values()],
+        'APRS': [handleData.parse_aprs(unifier, package[:-2]) for package in corpus.aprs_packages.values()]
+    }
+    functions = {
+        'JSON': (unify_json_reference, handleData.unify_json),
+        'APRS': (unify_aprs_reference, handleData.unify_aprs)
+    }
+
+    for source in telemetry:
+        reference_function, plan_function = functions[source]
+        # Both ways of unification must give the same unified telemetry
+        # The plans unify the telemetry to records, which are converted to dictionaries for the comparison
+        mismatches = sum(1 for package_telemetry in telemetry[source] if reference_function(unifier, package_telemetry) != plan_function(unifier, package_telemetry).to_dict())
+        print('{} verification: {:d} packages, {:d} mismatches'.format(source, len(telemetry[source]), mismatches))
+        if mismatches > 0:
+            sys.exit(1)
+        for name, function in [('loop', reference_function), ('plan', plan_function)]:
+            duration = timeit.timeit(lambda: [function(unifier, package_telemetry) for package_telemetry in telemetry[source]], number=arguments.count)
+            print('{} {:<4} {:>10.0f} packages/s'.format(source, name, arguments.count * len(telemetry[source]) / duration))
@@ -0,0 +1,93 @@
+# workerScaling.py - Benchmark for processing packages with several worker processes
+#
+# Copyright (C) Simon Schäfer <simon.gsa@web.de>
+#
+# Released under GNU GPL v3 or later
+
+
+# Modules
+import os
+import sys
+import time
+import datetime
+import tempfile
+import argparse
+import multiprocessing
+# Own modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mainConfig
+import SondeHubUploader.shuConfig as shuConfig
+import SondeHubUploader.admission as admission
+import SondeHubUploader.crc as shuCrc
+import SondeHubUploader.workerProcesses as workerProcesses
+import corpus
+import standIn
+
+
+# Create a stand-in for the SondeHubUploader that hands packages over to the worker processes
+def create_dispatcher(args):
+    # The configuration parameters are passed on to the worker processes
+    # Handing packages over is only given up if the SondeHubUploader is terminated
+    # The statistics of the worker processes are added up when they are stopped
+    return standIn.StandIn(**args, worker_args=args, running=True, admission_statistics=dict.fromkeys(admission.rejection_reasons, 0),
+                           failure_statistics=dict.fromkeys(shuConfig.failure_sites, 0))
+
+
+# Build packages for a number of different radiosondes
+# The RS41 package of the corpus is used, with its serial and time replaced and its CRC recalculated
+def build_packages(radiosondes):
+    calculator = shuCrc.Crc16(0x1021, 0xFFFF, 0xFFFF)
+    template = corpus.aprs_packages['RS41'][:-2]
+    # The time of the packages is replaced with the current time, so that it is plausible
+    now = datetime.datetime.utcnow().strftime('%H%M%S').encode()
+    packages = []
+    for radiosonde in range(radiosondes):
+        package = template[:17] + 'S{:07d} '.format(radiosonde).encode() + template[26:27] + now + template[33:]
+        checksum = calculator.checksum(package)
+        packages.append((package + bytes([checksum & 0xFF, checksum >> 8]), ('127.0.0.1', 18001)))
+    return packages
+
+
+# Measure the number of packages per second that are processed by a number of worker processes
+def measure(args, packages, batches, procs):
+    dispatcher = create_dispatcher(dict(args, procs=procs))
+    workerProcesses.start_worker_processes(dispatcher)
+    try:
+        # The first batch is processed before measuring, so all worker processes are up and running
+        workerProcesses.dispatch(dispatcher, packages)
+        received = 0
+        while received < len(packages):
+            received += len(dispatcher.worker_result_queue.get()[1])
+        start = time.perf_counter()
+        for batch in range(batches):
+            workerProcesses.dispatch(dispatcher, packages)
+        # Wait until the reformatted telemetry of all packages was received
+        received = 0
+        while received < batches * len(packages):
+            received += len(dispatcher.worker_result_queue.get()[1])
+        duration = time.perf_counter() - start
+    finally:
+        workerProcesses.stop_worker_processes(dispatcher)
+    return batches * len(packages) / duration
+
+
+if __name__ == '__main__':
+    argumentParser = argparse.ArgumentParser(description='Benchmark for processing packages with several worker processes')
+    argumentParser.add_argument('-n', '--count', type=int, default=200, help='Number of batches per measurement')
+    argumentParser.add_argument('-r', '--radiosondes', type=int, default=64, help='Number of radiosondes (and packages per batch)')
+    argumentParser.add_argument('-w', '--workers', type=int, default=multiprocessing.cpu_count(), help='Max. number of worker processes')
+    arguments = argumentParser.parse_args()
+
+    # The default configuration parameters are used, without writing any files or logs
+    args = {parameter: definition['default'] for parameter, definition in mainConfig.configuration_parameters.items()}
+    args.update(pos=[48.1, 11.5, 500.0], mail='benchmark@example.com', call='BENCH', filepath=tempfile.gettempdir(), writel=0, loglevelp=1)
+    packages = build_packages(arguments.radiosondes)
+
+    print('{:d} CPU cores'.format(multiprocessing.cpu_count()))
+    baseline = None
+    procs = 1
+    while procs <= arguments.workers:
+        rate = measure(args, packages, arguments.count, procs)
+        baseline = rate if baseline is None else baseline
+        print('{:>2d} worker processes {:>8.0f} packages/s (x{:.2f})'.format(procs, rate, rate / baseline))
+        procs *= 2
@@ -64,6 +64,16 @@ configuration_parameters = {
         'check_function':       lambda a: str(a).isdigit() and 1024 <= int(a) <= 65353,
         'required':             False
     },
+    'listen':
+    {
+        'full_name':            'Additional Listeners',
+        'type':                 list,
+        'default':              None,
+        'positional_argument':  'm',
+        'description':          'Additional addresses and ports for UDP sockets (address:port, separated by commas)',
+        'check_function':       lambda a: parameterChecks.check_listeners(a, 1024, 65353),
+        'required':             False
+    },
     'mode':
     {
         'full_name':            'Mode',
@@ -124,16 +134,96 @@ configuration_parameters = {
         'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1,
         'required':             False
     },
+    'engine':
+    {
+        'full_name':            'Engine',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'n',
+        'description':          'Engine (0 = threads / 1 = asyncio)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1,
+        'required':             False
+    },
     'qin':
     {
         'full_name':            'Input Queue Size',
         'type':                 int,
         'default':              20,
         'positional_argument':  'q',
-        'description':          'Size of the queue for storing the incoming packages before processing',
+        'description':          'Size of the queue for storing the incoming packages before processing (asyncio engine / each worker process)',
         'check_function':       lambda a: str(a).isdigit() and 1 <= int(a) <= 100,
         'required':             False
     },
+    'rslots':
+    {
+        'full_name':            'Input Ring Buffer Slots',
+        'type':                 int,
+        'default':              256,
+        'positional_argument':  'Q',
+        'description':          'Number of slots of the ring buffers for storing the incoming packages before processing (threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 1 <= int(a) <= 4096,
+        'required':             False
+    },
+    'rsize':
+    {
+        'full_name':            'Input Ring Buffer Slot Size',
+        'type':                 int,
+        'default':              1024,
+        'positional_argument':  'L',
+        'description':          'Size of each slot of the ring buffers for storing the incoming packages in bytes (threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 256 <= int(a) <= 65535,
+        'required':             False
+    },
+    'recvm':
+    {
+        'full_name':            'Receive Mode',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'x',
+        'description':          'Receive mode (0 = single / 1 = batched, threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1,
+        'required':             False
+    },
+    'pbatch':
+    {
+        'full_name':            'Processing Batch Size',
+        'type':                 int,
+        'default':              64,
+        'positional_argument':  'B',
+        'description':          'Max. number of packages that are processed as one batch',
+        'check_function':       lambda a: str(a).isdigit() and 1 <= int(a) <= 4096,
+        'required':             False
+    },
+    'pdead':
+    {
+        'full_name':            'Processing Batch Deadline',
+        'type':                 int,
+        'default':              5,
+        'positional_argument':  'D',
+        'description':          'Max. time in milliseconds to wait for further packages before a batch is processed',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1000,
+        'required':             False
+    },
+    'procs':
+    {
+        'full_name':            'Worker Processes',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'W',
+        'description':          'Number of worker processes for processing packages (0 = no worker processes, threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 64,
+        'required':             False
+    },
+    'pipe':
+    {
+        'full_name':            'Pipeline Mode',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'P',
+        'description':          'Process packages in a pipeline of stage threads (0 = no / 1 = yes, threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1,
+        'required':             False
+    },
     'qupl':
     {
         'full_name':            'Upload Queue Size',
@@ -224,6 +314,36 @@ configuration_parameters = {
         'check_function':       lambda a: str(a).isdigit() and 1 <= int(a) <= 60,
         'required':             False
     },
+    'surl':
+    {
+        'full_name':            'SondeHub URL',
+        'type':                 str,
+        'default':              'https://api.v2.sondehub.org',
+        'positional_argument':  'U',
+        'description':          'Base URL of SondeHub (for uploading to a local stand-in of SondeHub)',
+        'check_function':       lambda a: parameterChecks.check_url(a),
+        'required':             False
+    },
+    'aggs':
+    {
+        'full_name':            'Aggregator Socket',
+        'type':                 str,
+        'default':              None,
+        'positional_argument':  'X',
+        'description':          'Path of the Unix socket of the upload aggregator',
+        'check_function':       lambda a: parameterChecks.check_socket_path(a),
+        'required':             False
+    },
+    'aggm':
+    {
+        'full_name':            'Aggregator Mode',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'H',
+        'description':          'Run as upload aggregator for other instances (0 = no / 1 = yes, threads engine)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 1,
+        'required':             False
+    },
     'sonde':
     {
         'full_name':            'Enabled Radiosondes',
@@ -233,6 +353,36 @@ configuration_parameters = {
         'description':          'Radiosondes enabled for upload',
         'check_function':       lambda a: parameterChecks.check_enabled_radiosondes(a),
         'required':             False
+    },
+    'rejser':
+    {
+        'full_name':            'Rejected Serials',
+        'type':                 str,
+        'default':              None,
+        'positional_argument':  'S',
+        'description':          'Regular expressions for serials of radiosondes that are rejected (separated by commas)',
+        'check_function':       lambda a: parameterChecks.check_serial_patterns(a),
+        'required':             False
+    },
+    'fence':
+    {
+        'full_name':            'Geofence Radius',
+        'type':                 int,
+        'default':              0,
+        'positional_argument':  'G',
+        'description':          'Radius in km around the user position outside of which radiosondes are rejected (0 = no geofence)',
+        'check_function':       lambda a: str(a).isdigit() and 0 <= int(a) <= 20000,
+        'required':             False
+    },
+    'altb':
+    {
+        'full_name':            'Altitude Bands',
+        'type':                 list,
+        'default':              None,
+        'positional_argument':  'A',
+        'description':          'Altitude bands in m outside of which radiosondes are rejected (min:max, separated by commas)',
+        'check_function':       lambda a: parameterChecks.check_altitude_bands(a),
+        'required':             False
     }
 }
 
@@ -7,6 +7,9 @@
 
 # Modules
 import ipaddress
+import os.path
+import re
+import urllib.parse
 # Own modules
 import mainConfig
 
@@ -20,6 +23,23 @@ def check_address(address):
         return False
 
 
+# Check whether a list of listeners is valid
+def check_listeners(listeners, min_port, max_port):
+    try:
+        # The individual listeners are separated by commas
+        for listener in listeners.split(','):
+            # Address and port of a listener are separated by a colon
+            address, port = listener.rsplit(':', 1)
+            # The address must be valid and the port must be within a certain range (generic definition)
+            if not check_address(address) or not port.isdigit() or not min_port <= int(port) <= max_port:
+                return False
+        return True
+    # Checking the listeners could throw several exceptions
+    # Because of that, they are just handled all
+    except Exception:
+        return False
+
+
 # Check whether a user callsign is valid
 def check_user_callsign(user_callsign, min_length, max_length):
     # Allowed characters
@@ -69,6 +89,48 @@ def check_enabled_radiosondes(enabled_radiosondes):
     return False
 
 
+# Check whether a list of patterns for serials is valid
+def check_serial_patterns(serial_patterns):
+    # The individual patterns are separated by commas
+    # Every pattern must be a valid regular expression
+    try:
+        for serial_pattern in serial_patterns.split(','):
+            re.compile(serial_pattern)
+        return True
+    except re.error:
+        return False
+
+
+# Check whether a list of altitude bands is valid
+def check_altitude_bands(altitude_bands):
+    try:
+        # The individual altitude bands are separated by commas
+        for altitude_band in altitude_bands.split(','):
+            # Minimum and maximum altitude of an altitude band are separated by a colon
+            minimum, maximum = [float(value) for value in altitude_band.split(':')]
+            # The minimum altitude must not be higher than the maximum altitude
+            if minimum > maximum:
+                return False
+        return True
+    # Checking the altitude bands could throw several exceptions
+    # Because of that, they are just handled all
+    except Exception:
+        return False
+
+
+# Check whether a URL is valid
+def check_url(url):
+    # Only HTTP and HTTPS URLs with a host are valid
+    parsed_url = urllib.parse.urlparse(url)
+    return parsed_url.scheme in ['http', 'https'] and parsed_url.netloc != ''
+
+
+# Check whether a path for a Unix socket is valid
+def check_socket_path(socket_path):
+    # The directory of the socket must exist and the path must not exceed the max. length of a Unix socket path
+    return os.path.isdir(os.path.dirname(os.path.abspath(socket_path))) and len(socket_path.encode('utf-8')) < 108
+
+
 # Check whether all required configuration parameters were provided
 def check_required(casted_parameters):
     result = True
@@ -80,4 +142,8 @@ def check_required(casted_parameters):
             if casted_parameters[parameter] == mainConfig.configuration_parameters[parameter]['default']:
                 print(f'Error: The configuration parameter {mainConfig.configuration_parameters[parameter]["full_name"]} that you provided is invalid')
                 result = False
+    # The aggregator socket is required if running as upload aggregator
+    if casted_parameters['aggm'] == 1 and casted_parameters['aggs'] is None:
+        print(f'Error: The configuration parameter {mainConfig.configuration_parameters["aggs"]["full_name"]} is required for {mainConfig.configuration_parameters["aggm"]["full_name"]}')
+        result = False
     return result
@@ -69,6 +69,12 @@ def cast(parameters):
         # The configuration parameter 'pos' is somewhat special since it is a list of floats
         if key == 'pos' and parameters[key] is not None:
             parameters[key] = [float(element) for element in value.split(',')]
+        # The configuration parameter 'listen' is a list of tuples, each containing an address and a port
+        elif key == 'listen' and parameters[key] is not None:
+            parameters[key] = [(element.rsplit(':', 1)[0], int(element.rsplit(':', 1)[1])) for element in value.split(',')]
+        # The configuration parameter 'altb' is a list of tuples, each containing a minimum and a maximum altitude
+        elif key == 'altb' and parameters[key] is not None:
+            parameters[key] = [tuple(float(altitude) for altitude in element.split(':')) for element in value.split(',')]
         else:
             # All integer configuration parameters are cast to 'int'
             if mainConfig.configuration_parameters[key]['type'] == int and type(parameters[key]) != mainConfig.configuration_parameters[key]['type']:
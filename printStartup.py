@@ -23,6 +23,9 @@ def print_prolog(parameters):
         # The 'pos' configuration parameter is somewhat special, since it is composed of 3 individual parameters
         if key == 'pos':
             value = 'Lat: {} / Lon: {} / Alt: {}'.format(*value)
+        # The 'listen' configuration parameter is a list of addresses and ports
+        elif key == 'listen' and value is not None:
+            value = ' / '.join('{}:{}'.format(*listener) for listener in value)
         # All other configuration parameters are just printed with their full name and value
         print(parameter_string.format(mainConfig.configuration_parameters[key]['full_name'] + ':', value))
 